@@ -0,0 +1,230 @@
+import inspect
+import math
+from decimal import Decimal
+
+import numpy as np
+
+import src.constants as c
+from src.breakdown.vectorizedengine import breakdown_arrays, compounding_yearly
+from src.decimal.dollar import Dollar
+from src.mortgage import MAX_DEDUCTIBLE_LOAN_AMOUNT, _monthly_payment
+from src.scenario import FACTORIES, YAML_KEYS
+from src.sweep import SUMMARY_COLUMNS, break_even_years
+from src.income import tax_savings
+from src.taxes import federal_taxes, state_taxes, tax_deduction
+
+# Columns of a scenarios table are dotted param paths, e.g. purchase.price, or the flat keys of the yaml scenarios
+PARAM_COLUMNS = [
+    f'{name}.{param}' for name, factory in FACTORIES.items() for param in inspect.signature(factory).parameters
+] + ['index_fund_annual_return_percent']
+RESULT_COLUMNS = SUMMARY_COLUMNS + ['home_investment_value', 'index_fund_value']
+# Scenarios evaluated at a time, each (scenarios x months) column of a chunk of 30 year loans takes ~1.5MB
+CHUNK_SCENARIOS = 512
+
+# AmortizationSchedule quantizes the interest rate to millionths
+_RATE_UNITS = 10 ** 6
+
+
+def _params(table):
+    # Table to param path to a float array, where a missing value is nan
+    names = table.column_names if hasattr(table, 'column_names') else list(table.keys())
+    params = {}
+    for name in names:
+        path = YAML_KEYS.get(name, name)
+        if path in PARAM_COLUMNS:
+            values = table.column(name).to_numpy(zero_copy_only=False) if hasattr(table, 'column') else table[name]
+            params[path] = np.asarray(values, dtype=float)
+    return params
+
+
+def _param(params, size, path, default=None):
+    # Factories treat None and 0 the same for optional params, e.g. rent_annual_increase_percent or 0, and unset rates
+    # as 0
+    values = params.get(path, np.full(size, np.nan))
+    if default is None:
+        assert not np.isnan(values).any(), f'{path} is required'
+        return values
+    return np.where(np.isnan(values) | (values == 0), default, values)
+
+
+def amortization_arrays(rates, loan_term_months, loan_amounts):
+    # Cent rounded amortization of every loan at once, matching AmortizationSchedule, with 0 after the last payment. A
+    # loan amount with a fraction of a cent can leave a last payment of a few cents in the month after the term
+    size, months = len(rates), int(loan_term_months.max()) + c.MONTHS_PER_YEAR
+    payment = np.zeros(size, dtype=np.int64)
+    balance = np.zeros(size, dtype=np.int64)
+    rate_units = np.zeros(size, dtype=np.int64)
+    # Payments and interest are whole cents, so the fraction of a cent of the balance never changes. It only breaks
+    # ties when the interest is rounded, which floor(2 * fraction * rate_units) does exactly in integers
+    fraction = np.zeros(size)
+    tie_breaker = np.zeros(size, dtype=np.int64)
+    for index, (rate, term, loan) in enumerate(zip(rates, loan_term_months, loan_amounts)):
+        loan_cents = loan.to_decimal() * 100
+        rate_units[index] = int(Decimal(rate).quantize(Decimal('.000001')) * _RATE_UNITS)
+        payment[index] = _monthly_payment(rate, int(term), loan).cents
+        balance[index] = math.floor(loan_cents)
+        fraction[index] = float(loan_cents - balance[index])
+        tie_breaker[index] = math.floor(2 * (loan_cents - balance[index]) * rate_units[index])
+
+    denominator = 2 * c.MONTHS_PER_YEAR * _RATE_UNITS
+    principle = np.zeros((size, months + 1))
+    interest = np.zeros((size, months + 1), dtype=np.int64)
+    lengths = np.zeros(size, dtype=np.int64)
+    active = np.ones(size, dtype=bool)
+    for month in range(1, months + 1):
+        month_interest = (2 * balance * rate_units + denominator // 2 + tie_breaker) // denominator
+        # payment >= balance + interest, where the balance has its fraction of a cent
+        last = active & (payment - month_interest - balance >= (fraction > 0))
+        month_principle = np.where(last, balance, payment - month_interest) * active
+        principle[:, month] = month_principle + np.where(last, fraction, 0.)
+        interest[:, month] = month_interest * active
+        balance -= month_principle
+        lengths[last] = month
+        active &= ~last
+        if not active.any():
+            break
+
+    end = lengths.max() + 1
+    return principle[:, :end] / 100, interest[:, :end] / 100, lengths
+
+
+def scenario_arrays(params, size):
+    # (scenarios x months) breakdown columns for param path to float arrays, plus the breakdown length of each scenario
+    def p(path, default=None):
+        return _param(params, size, path, default)
+
+    price = p('purchase.price')
+    down_payment, down_payment_percent = p('purchase.down_payment', np.nan), p('purchase.down_payment_percent', np.nan)
+    assert not (~np.isnan(down_payment) & ~np.isnan(down_payment_percent)).any(), (
+        'down_payment and down_payment_percent are mutually exclusive'
+    )
+    assert not (np.isnan(down_payment) & np.isnan(down_payment_percent)).any(), (
+        'down_payment or down_payment_percent is required'
+    )
+    down_payment = np.where(np.isnan(down_payment), price * down_payment_percent / 100, down_payment)
+    closing_cost = price * p('purchase.closing_cost_percent', 0.) / 100
+
+    interest_rate = p('mortgage.interest_rate_percent') / 100
+    loan_term_years = p('mortgage.loan_term_years')
+    assert (loan_term_years % 1 == 0).all(), 'loan_term_years must be a whole number'
+    loan_term_months = loan_term_years.astype(int) * c.MONTHS_PER_YEAR
+    # Loan amounts are the exact Dollar differences Mortgage amortizes
+    loan_amounts = [Dollar(v) - Dollar(down) for v, down in zip(price.tolist(), down_payment.tolist())]
+    principle, interest, lengths = amortization_arrays(interest_rate, loan_term_months, loan_amounts)
+    # The deductible part of the interest only depends on the terms, which are shared by most scenarios
+    terms, scenario_terms = np.unique(np.stack((interest_rate, loan_term_months)), axis=1, return_inverse=True)
+    _, max_deductible_interest, _ = amortization_arrays(
+        terms[0], terms[1].astype(int), [MAX_DEDUCTIBLE_LOAN_AMOUNT] * terms.shape[1]
+    )
+    max_deductible_interest = max_deductible_interest[scenario_terms.ravel()]
+    months = interest.shape[1] - 1
+    padding = max(months + 1 - max_deductible_interest.shape[1], 0)
+    max_deductible_interest = np.pad(max_deductible_interest, ((0, 0), (0, padding)))[:, :months + 1]
+    deductible_interest = np.minimum(max_deductible_interest, interest)
+
+    def column(values):
+        return values[:, None]
+
+    def comp_yearly(initial, annual_increase_path):
+        return column(initial), column(p(annual_increase_path, 0.) / 100)
+
+    property_tax = comp_yearly(
+        p('taxes.property_tax_percent', 0.) / 100 * price / c.MONTHS_PER_YEAR,
+        'taxes.property_tax_annual_increase_percent',
+    )
+    # Taxes.tax_deduction_per_year and Income.tax_savings_per_year for every full year of the longest loan, a partial
+    # last year has none
+    full_years = months // c.MONTHS_PER_YEAR
+    yearly_deductible_interest = (
+        deductible_interest[:, 1:full_years * c.MONTHS_PER_YEAR + 1].reshape(size, -1, c.MONTHS_PER_YEAR).sum(axis=2)
+    )
+    # Taxes deducts the property tax of month 0
+    deduction = tax_deduction(
+        yearly_deductible_interest,
+        compounding_yearly(*property_tax, np.zeros((size, 1), dtype=int)),
+        column(p('taxes.yearly_income')),
+        dollar=np.asarray,
+        minimum=np.minimum,
+    )
+    federal_tax_rate = column(p('taxes.federal_tax_rate_percent', 0.) / 100)
+    state_tax_rate = column(p('taxes.state_tax_rate_percent', 0.) / 100)
+    tax_savings_per_year = (
+            tax_savings(deduction, federal_tax_rate, federal_taxes()['standard_deduction'], np.asarray, np.maximum)
+            + tax_savings(deduction, state_tax_rate, state_taxes()['standard_deduction'], np.asarray, np.maximum)
+    )
+    partial_years = -(-months // c.MONTHS_PER_YEAR) - full_years
+    tax_savings_per_year = np.pad(tax_savings_per_year, ((0, 0), (1, partial_years)))
+
+    cols = breakdown_arrays(dict(
+        principle=principle,
+        interest=interest,
+        deductible_interest=deductible_interest,
+        tax_savings_per_year=tax_savings_per_year,
+        property_tax=property_tax,
+        hoi=comp_yearly(
+            p('operating_expenses.hoi_percent', 0.) / 100 * price / c.MONTHS_PER_YEAR,
+            'operating_expenses.hoi_annual_increase_percent',
+        ),
+        hoa=comp_yearly(p('operating_expenses.hoa', 0.), 'operating_expenses.hoa_annual_increase_percent'),
+        maintenance=comp_yearly(
+            p('operating_expenses.maintenance_percent', 0.) / 100 * price / c.MONTHS_PER_YEAR,
+            'operating_expenses.maintenance_annual_increase_percent',
+        ),
+        rent=comp_yearly(p('income.rent', 0.), 'income.rent_annual_increase_percent'),
+        tenant_rent=comp_yearly(p('income.tenant_rent', 0.), 'income.tenant_rent_annual_increase_percent'),
+        vacancy_rate=column(p('income.vacancy_percent', 0.) / 100),
+        management_fee_rate=column(p('income.management_fee_percent', 0.) / 100),
+        price=column(price),
+        down_payment=column(down_payment),
+        closing_cost=column(closing_cost),
+        cost_initial=column(down_payment + closing_cost),
+        annual_appreciation_rate=column(p('sale.annual_appreciation_percent', 0.) / 100),
+        sale_closing_cost_rate=column(p('sale.closing_cost_percent', 0.) / 100),
+        index_fund_annual_return_rate=column(p('index_fund_annual_return_percent', 10.) / 100),
+    ), [k for k in RESULT_COLUMNS if k != 'break_even_year'])
+    return cols, lengths
+
+
+def _summaries(cols, lengths):
+    # The same summary as sweep.summarize, read at the last month of each scenario's breakdown
+    size = len(lengths)
+    last = {k: cols[k][np.arange(size), lengths] for k in RESULT_COLUMNS if k != 'break_even_year'}
+    month = np.arange(cols['score'].shape[1])
+    last['break_even_year'] = break_even_years(month, np.where(month <= lengths[:, None], cols['score'], np.nan))
+    return last
+
+
+def evaluate(table, chunk_scenarios=CHUNK_SCENARIOS):
+    # Evaluates a pandas DataFrame, pyarrow Table or dict of columns with one scenario per row, returning the same kind
+    # of table with the RESULT_COLUMNS appended to its columns
+    params = _params(table)
+    size = len(next(iter(params.values()))) if params else 0
+    results = {k: [] for k in RESULT_COLUMNS}
+    for start in range(0, size, chunk_scenarios):
+        chunk = {path: values[start:start + chunk_scenarios] for path, values in params.items()}
+        cols, lengths = scenario_arrays(chunk, len(next(iter(chunk.values()))))
+        for k, values in _summaries(cols, lengths).items():
+            results[k].append(values)
+    results = {k: np.concatenate(v) if v else np.array([]) for k, v in results.items()}
+    return _table(table, results)
+
+
+def _table(table, results):
+    module = type(table).__module__.split('.')[0]
+    if module == 'pandas':
+        import pandas as pd
+
+        out = table.copy()
+        for k, values in results.items():
+            out[k] = pd.array(values, dtype='Int64') if k == 'break_even_year' else values
+        return out
+    if module == 'pyarrow':
+        import pyarrow as pa
+
+        for k, values in results.items():
+            if k == 'break_even_year':
+                table = table.append_column(k, pa.array(np.nan_to_num(values).astype(int), mask=np.isnan(values)))
+            else:
+                table = table.append_column(k, pa.array(values))
+        return table
+    return {name: np.asarray(table[name]) for name in table.keys()} | results
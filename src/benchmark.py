@@ -0,0 +1,223 @@
+import argparse
+import contextlib
+import datetime
+import glob
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from src.fixtures import FIXTURES
+from src.helpers import rel
+from src.profiling import profile
+from src.scenario import build_home_investment, params_from_yaml, with_params
+from src.sweep import sweep
+
+CSV_METHODS = ['csv', 'csv_operating_cost', 'csv_income', 'csv_cashflow', 'csv_investment', 'csv_investment_short']
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark scenario construction, breakdowns and csv exports')
+    parser.add_argument(
+        '-o', '--output',
+        help='Path of the json results, defaults to output/benchmarks/<commit>.json',
+        type=os.path.abspath,
+        default=None
+    )
+    parser.add_argument(
+        '-c', '--compare',
+        help='Path of a previous json results file to compare against',
+        type=os.path.abspath,
+        default=None
+    )
+    parser.add_argument(
+        '-t', '--loan-terms',
+        help='Loan terms in years the yaml scenarios are run at',
+        type=int,
+        nargs='+',
+        default=[15, 30]
+    )
+    parser.add_argument(
+        '-s', '--sweep-sizes',
+        help='Number of scenarios in each benchmarked sweep',
+        type=int,
+        nargs='+',
+        default=[16, 64]
+    )
+    parser.add_argument(
+        '-e', '--engines',
+        help='Breakdown engines to benchmark',
+        choices=['decimal', 'vectorized', 'yearly'],
+        nargs='+',
+        default=['decimal', 'vectorized']
+    )
+    parser.add_argument(
+        '-r', '--repeat',
+        help='Runs per case, the fastest one is reported and the last one is profiled',
+        type=int,
+        default=3
+    )
+    return parser.parse_args(sys.argv[1:])
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=rel('..'), stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def cases(loan_terms, engines):
+    # Each case is (name, loan_term_years, engine, build) where build(output_dir) returns a fresh HomeInvestment. The
+    # yaml scenarios run at every loan term, the test fixtures at their own
+    for engine in engines:
+        for path in sorted(glob.glob(rel('../scenarios/*.yaml'))):
+            params = params_from_yaml(path)
+            for loan_term_years in loan_terms:
+                case_params = with_params(params, {'mortgage.loan_term_years': loan_term_years})
+                yield (
+                    params['scenario_name'],
+                    loan_term_years,
+                    engine,
+                    lambda output_dir, p=case_params, e=engine: build_home_investment(
+                        p, breakdown_engine=e, output_dir=output_dir
+                    ),
+                )
+
+        for name, params in FIXTURES.items():
+            yield (
+                name,
+                params['mortgage']['loan_term_years'],
+                engine,
+                lambda output_dir, p=params, e=engine: build_home_investment(
+                    p, breakdown_engine=e, output_dir=output_dir
+                ),
+            )
+
+
+def _run_stages(build, output_dir, measure):
+    def csv():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [getattr(b, m)() for b in (breakdown.monthly, breakdown.yearly) for m in CSV_METHODS]
+
+    results = {}
+    home_investment, results['construct'] = measure(lambda: build(output_dir))
+    breakdown = home_investment.breakdown
+    _, results['monthly'] = measure(breakdown.monthly.list)
+    _, results['yearly'] = measure(breakdown.yearly.list)
+    _, results['csv'] = measure(csv)
+    return results
+
+
+def _time(f):
+    start = time.perf_counter()
+    value = f()
+    return value, dict(seconds=time.perf_counter() - start)
+
+
+def _memory(f):
+    blocks = sys.getallocatedblocks()
+    tracemalloc.reset_peak()
+    start_bytes, _ = tracemalloc.get_traced_memory()
+    value = f()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    return value, dict(peak_bytes=peak_bytes - start_bytes, allocated_blocks=sys.getallocatedblocks() - blocks)
+
+
+def benchmark_case(build, repeat, output_dir):
+    # Timings are taken without tracemalloc, which would slow them down, and memory is measured in a separate run
+    timings = [_run_stages(build, output_dir, _time) for _ in range(repeat - 1)]
+    with profile() as p:
+        timings.append(_run_stages(build, output_dir, _time))
+    tracemalloc.start()
+    try:
+        memory = _run_stages(build, output_dir, _memory)
+    finally:
+        tracemalloc.stop()
+
+    stages = {
+        stage: dict(seconds=min(t[stage]['seconds'] for t in timings)) | memory[stage]
+        for stage in memory
+    }
+    return dict(seconds=sum(s['seconds'] for s in stages.values()), stages=stages, profile=p.report())
+
+
+def benchmark_import(repeat):
+    # Import of the model in a fresh interpreter, which every sweep and cli worker pays
+    code = 'import time; start = time.perf_counter(); import src.homeinvestment; print(time.perf_counter() - start)'
+    seconds = min(
+        float(subprocess.check_output([sys.executable, '-c', code], cwd=rel('..'), text=True))
+        for _ in range(repeat)
+    )
+    return dict(seconds=seconds)
+
+
+def benchmark_sweep(size, output_dir):
+    base = params_from_yaml(rel('../scenarios/house.yaml'))
+    prices = [500000 + 10000 * i for i in range(size)]
+    start = time.perf_counter()
+    sweep(base, {'purchase.price': prices}, os.path.join(output_dir, f'sweep_{size}.csv'))
+    seconds = time.perf_counter() - start
+    return dict(size=size, processes=os.cpu_count(), seconds=seconds, scenarios_per_second=size / seconds)
+
+
+def run(loan_terms, sweep_sizes, engines, repeat):
+    results = dict(
+        commit=_git_commit(),
+        python=platform.python_version(),
+        timestamp=datetime.datetime.now().isoformat(timespec='seconds'),
+        cases=[],
+        sweeps=[],
+    )
+    results['import'] = benchmark_import(repeat)
+    print(f'import: {results["import"]["seconds"] * 1000:.1f}ms')
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name, loan_term_years, engine, build in cases(loan_terms, engines):
+            result = benchmark_case(build, repeat, os.path.join(output_dir, name))
+            results['cases'].append(dict(name=name, loan_term_years=loan_term_years, engine=engine) | result)
+            print(f'{name} {loan_term_years}y {engine}: {result["seconds"] * 1000:.1f}ms')
+
+        for size in sweep_sizes:
+            result = benchmark_sweep(size, output_dir)
+            results['sweeps'].append(result)
+            print(f'sweep of {size}: {result["scenarios_per_second"]:.1f} scenarios/s')
+
+    return results
+
+
+def compare(results, baseline):
+    def key(case):
+        return case['name'], case['loan_term_years'], case['engine']
+
+    baseline_cases = {key(case): case for case in baseline['cases']}
+    print(f'\n{baseline["commit"]} -> {results["commit"]}')
+    for case in results['cases']:
+        old = baseline_cases.get(key(case))
+        if old is None:
+            continue
+        ratios = ', '.join(
+            f'{stage} {s["seconds"] / old["stages"][stage]["seconds"]:.2f}x'
+            for stage, s in case['stages'].items() if stage in old['stages']
+        )
+        print(f'{case["name"]} {case["loan_term_years"]}y {case["engine"]}: {ratios}')
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    benchmark_results = run(args.loan_terms, args.sweep_sizes, args.engines, args.repeat)
+    output_path = args.output or rel('../output/benchmarks', f'{benchmark_results["commit"]}.json')
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(benchmark_results, f, indent=2)
+    print(f'\nOutputting benchmark results to {output_path}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(benchmark_results, json.load(f))
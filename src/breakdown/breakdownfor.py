@@ -1,19 +1,90 @@
 from __future__ import annotations
 
-import functools
 import os
+import struct
+import zlib
 from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING, Generator, Literal
 
-import pandas as pd
-from tabulate import tabulate
-
+from src.breakdown.columns import MONTH_COLUMNS, MONTH_KEYS, YEAR_COLUMNS, YEAR_KEYS
+from src.breakdown.export import EXTENSIONS, ExportFormat, write_views
 from src.breakdown.row import BreakdownRow
-from src.helpers import rel
+from src.breakdown.timeline import Timeline
+from src.memorybudget import BUDGET, budgeted
+from src.profiling import timed
 
 if TYPE_CHECKING:
     from src.homeinvestment import HomeInvestment
 
+View = Literal['full', 'operating_cost', 'income', 'cashflow', 'investment', 'investment_short']
+
+VIEWS: dict[View, list[str]] = dict(
+    full=[],
+    operating_cost=[
+        'month',
+        'year',
+        'principle',
+        'interest',
+        'mortgage',
+        'property_tax',
+        'hoi',
+        'hoa',
+        'vacancy',
+        'maintenance',
+        'management_fee',
+        'operating_cost',
+        'net_operating_cost',
+    ],
+    income=[
+        'month',
+        'year',
+        'deductible_interest',
+        'tax_savings',
+        'rent',
+        'tenant_rent',
+        'income',
+        'net_income',
+    ],
+    cashflow=[
+        'month',
+        'year',
+        'income',
+        'adjusted_income',
+        'mortgage',
+        'operating_cost',
+        'expenses',
+        'cashflow',
+        'equity',
+        'cash_to_receive',
+    ],
+    investment=[
+        'month',
+        'year',
+        'cashflow',
+        'net_cashflow',
+        'equity',
+        'cashflow_surplus_index_fund_value',
+        'sale_closing_cost',
+        'cash_to_receive',
+        'home_investment_value',
+        'home_roi',
+        'index_fund_value',
+        'index_fund_roi',
+        'score',
+    ],
+    investment_short=[
+        'cashflow',
+        'net_cashflow',
+        'appreciated_price',
+        'equity',
+        'home_investment_value',
+        'home_roi',
+        'index_fund_value',
+        'index_fund_roi',
+        'score',
+    ],
+)
+
 
 class BreakdownFor(ABC, object):
     def __init__(self, home_investment: HomeInvestment, time_length: Literal['month', 'year']):
@@ -24,130 +95,138 @@ class BreakdownFor(ABC, object):
     def generator(self) -> Generator[BreakdownRow, None, None]:
         raise NotImplementedError
 
-    @functools.cache
-    def dicts(self):
-        return list(map(lambda bd: bd.dict(), self.list()))
+    @abstractmethod
+    def size(self):
+        # Number of rows, months 0 to the last payment or years 0 to the end of the loan
+        raise NotImplementedError
 
-    @functools.cache
-    def list(self):
-        return list(self.generator())
+    def window(self, start, stop) -> list[BreakdownRow]:
+        # Rows start to stop - 1, read from list() when it was built already
+        size = self.size()
+        assert 0 <= start <= stop <= size, f'{self.time_length.title()}s {start} to {stop} are outside of 0 to {size}'
+        cached = BUDGET.peek(self, 'list')
+        return cached[start:stop] if cached is not None else self._window(start, stop)
+
+    @abstractmethod
+    def _window(self, start, stop) -> list[BreakdownRow]:
+        # Rows start to stop - 1, without building the rows before start where the engine allows it
+        raise NotImplementedError
+
+    def at(self, index) -> BreakdownRow:
+        # Row of a month or year, e.g. breakdown.monthly.at(240). Before list() is built, an engine that jumps over the
+        # months before it, like the Decimal one, can differ from list() by a fraction of a cent
+        return self.window(index, index + 1)[0]
+
+    def dicts(self):
+        # Formatted on every call, only the timeline is kept
+        return self.list().dicts()
+
+    @budgeted
+    def list(self) -> Timeline:
+        home_investment = self._home_investment
+        if home_investment.cache is None:
+            return self._rows()
+
+        key = f'{home_investment.cache_key}-{home_investment.breakdown.engine}-{self.time_length}'
+        data = home_investment.cache.get(key)
+        if data is not None:
+            try:
+                with timed(f'breakdown.{self.time_length}.cache_read'):
+                    return Timeline.from_bytes(data)
+            except (AssertionError, ValueError, zlib.error, struct.error):
+                home_investment.cache.delete(key)
+
+        rows = self._rows()
+        home_investment.cache.put(key, rows.to_bytes())
+        return rows
+
+    def _rows(self):
+        loan_term_months = self._home_investment.mortgage.loan_term_months
+        with timed(f'breakdown.{self.time_length}.rows'):
+            return Timeline.from_rows(self.generator(), self.columns, loan_term_months)
 
     def df(self, columns=None):
+        import pandas as pd
+
         df = pd.DataFrame(self.dicts())
         return df[columns] if columns else df
 
     def tabulate(self):
+        from tabulate import tabulate
+
         return tabulate(self.df(), headers='keys', showindex=False)
 
-    def _csv(self, filename, columns=None):
-        output_path = rel('../../output', self._home_investment.scenario_name, self.time_length, filename)
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        print(f'Outputting {filename} to {output_path}\n')
-        self.df(columns).to_csv(output_path, index=False)
-        return output_path
+    @property
+    def columns(self):
+        # (attribute, kind) of the rows, in the order they are assigned
+        if self.time_length == 'month':
+            return [(column.name, column.kind) for column in MONTH_COLUMNS]
+        return YEAR_COLUMNS
+
+    @property
+    def keys(self):
+        return MONTH_KEYS if self.time_length == 'month' else YEAR_KEYS
+
+    def view_columns(self, view: View):
+        if view == 'full':
+            return list(self.keys)
+
+        columns = list(VIEWS[view])
+        if self.time_length == 'year' and view in ('cashflow', 'investment'):
+            # The cashflow view lists cash_on_cash_return before equity, the investment view appends it
+            index = columns.index('equity') if view == 'cashflow' else len(columns)
+            columns.insert(index, 'cash_on_cash_return')
+        return columns
+
+    def invalidate(self):
+        # Drops the cached rows, e.g. after changing a component of the HomeInvestment in place
+        BUDGET.invalidate(self)
+
+    def _view_columns(self, views):
+        # (attribute, kind) of the columns the views write, in row order
+        names = {self.keys[key][0] for view in views for key in self.view_columns(view)}
+        return [(name, kind) for name, kind in self.columns if name in names]
+
+    def _view_rows(self, views):
+        # Rows export() writes the views from by default, an engine may compute only the columns the views need
+        return self.generator()
+
+    def export(self, views=tuple(VIEWS), fmt: ExportFormat = 'csv', rows=None):
+        # Writes every view in a single pass over rows, which defaults to streaming the generator
+        outputs = {}
+        for view in views:
+            filename = f'{view}.{EXTENSIONS[fmt]}'
+            output_path = os.path.join(self._home_investment.output_dir, self.time_length, filename)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            print(f'Outputting {filename} to {output_path}\n')
+            outputs[output_path] = self.view_columns(view)
+
+        with timed(f'breakdown.{self.time_length}.export'):
+            if rows is None:
+                # Rows that were already built are written instead of computing them again
+                cached = BUDGET.peek(self, 'list')
+                rows = self._view_rows(views) if cached is None else cached
+            write_views(rows, outputs, self.keys, fmt)
+        return list(outputs)
+
+    def _csv(self, view: View):
+        # The rows of list() when they were built already, otherwise only the view's columns
+        return self.export([view])[0]
 
     def csv(self):
-        filename = 'full.csv'
-        output_path = self._csv(filename)
-        return output_path
+        return self._csv('full')
 
     def csv_operating_cost(self):
-        columns = [
-            'month',
-            'year',
-            'principle',
-            'interest',
-            'mortgage',
-            'property_tax',
-            'hoi',
-            'hoa',
-            'vacancy',
-            'maintenance',
-            'management_fee',
-            'operating_cost',
-            'net_operating_cost',
-        ]
-
-        filename = 'operating_cost.csv'
-        output_path = self._csv(filename=filename, columns=columns)
-        return output_path
+        return self._csv('operating_cost')
 
     def csv_income(self):
-        columns = [
-            'month',
-            'year',
-            'deductible_interest',
-            'tax_savings',
-            'rent',
-            'tenant_rent',
-            'income',
-            'net_income',
-        ]
-
-        filename = 'income.csv'
-        output_path = self._csv(filename=filename, columns=columns)
-        return output_path
+        return self._csv('income')
 
     def csv_cashflow(self):
-        columns = [
-            'month',
-            'year',
-            'income',
-            'adjusted_income',
-            'mortgage',
-            'operating_cost',
-            'expenses',
-            'cashflow',
-        ]
-
-        if self.time_length == 'year':
-            columns.append('cash_on_cash_return')
-
-        columns += [
-            'equity',
-            'cash_to_receive'
-        ]
-
-        filename = 'cashflow.csv'
-        output_path = self._csv(filename=filename, columns=columns)
-        return output_path
+        return self._csv('cashflow')
 
     def csv_investment(self):
-        columns = [
-            'month',
-            'year',
-            'cashflow',
-            'net_cashflow',
-            'equity',
-            'cashflow_surplus_index_fund_value',
-            'sale_closing_cost',
-            'cash_to_receive',
-            'home_investment_value',
-            'home_roi',
-            'index_fund_value',
-            'index_fund_roi',
-            'score'
-        ]
-        if self.time_length == 'year':
-            columns.append('cash_on_cash_return')
-
-        filename = 'investment.csv'
-        output_path = self._csv(filename=filename, columns=columns)
-        return output_path
+        return self._csv('investment')
 
     def csv_investment_short(self):
-        columns = [
-            'cashflow',
-            'net_cashflow',
-            'appreciated_price',
-            'equity',
-            'home_investment_value',
-            'home_roi',
-            'index_fund_value',
-            'index_fund_roi',
-            'score'
-        ]
-
-        filename = 'investment_short.csv'
-        output_path = self._csv(filename=filename, columns=columns)
-        return output_path
+        return self._csv('investment_short')
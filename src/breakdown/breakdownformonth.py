@@ -4,54 +4,105 @@ from typing import TYPE_CHECKING, Generator
 
 import src.constants as c
 from src.breakdown.breakdownfor import BreakdownFor
+from src.breakdown.columns import dependency_order
+from src.breakdown.decimalengine import GRAPH, breakdown_columns, month_values
 from src.breakdown.rowmonth import RowMonth
+from src.breakdown.timeline import Timeline
 from src.decimal.dollar import Dollar
+from src.helpers import growth_series
+from src.profiling import timed
 
 if TYPE_CHECKING:
     from src.homeinvestment import HomeInvestment
 
+# Months between the saved rows random access starts from, a row is rebuilt in fewer steps than this from the last saved
+# row before it. Checkpoints are a year apart, so the months between two of them share every monthly input
+CHECKPOINT_MONTHS = c.MONTHS_PER_YEAR
+_ZERO = Dollar(0)
+# Columns of a month the running totals of a jump are computed from
+_JUMP_ORDER = dependency_order(
+    GRAPH, ['monthly_operating_cost', 'monthly_income', 'monthly_cashflow', 'monthly_appreciation']
+)
+
 
 class BreakdownForMonth(BreakdownFor):
     def __init__(self, home_investment: HomeInvestment):
         super().__init__(home_investment, 'month')
+        # Rows at months 0, CHECKPOINT_MONTHS, 2 * CHECKPOINT_MONTHS, ..., extended as far as queries need
+        self._checkpoints: list[RowMonth] = []
+
+    def _row(self, month, last: dict = None) -> RowMonth:
+        # The row of a month from the running totals of the month before, e.g. the values of its row
+        return RowMonth(self._home_investment, month, last)
 
     def generator(self) -> Generator[RowMonth, None, None]:
-        mortgage = self._home_investment.mortgage
-        
-        last = RowMonth(
-            home_investment=self._home_investment,
-            month=0,
-            year=0,
-            principle=Dollar(0),
-            interest=Dollar(0),
-            deductible_interest=Dollar(0),
-            net_operating_cost=Dollar(0),
-            net_income=Dollar(0),
-            net_cashflow=-Dollar(0),
-            principle_paid=Dollar(0),
-            interest_paid=Dollar(0),
-            appreciated_price=Dollar(0),
-            index_fund_value=Dollar(0),
-            cashflow_surplus_index_fund_value=Dollar(0)
-        )
-        yield last
-
-        for month, principle, interest, deductible_interest in mortgage.monthly_mortgage_schedule():
-            year = (month - 1) // c.MONTHS_PER_YEAR + 1
-            last = RowMonth(
-                home_investment=self._home_investment,
-                month=month,
-                year=year,
-                principle=principle,
-                interest=interest,
-                deductible_interest=deductible_interest,
-                net_operating_cost=last.net_operating_cost,
-                net_income=last.net_income,
-                net_cashflow=last.net_cashflow,
-                principle_paid=last.principle_paid,
-                interest_paid=last.interest_paid,
-                appreciated_price=last.appreciated_price,
-                index_fund_value=last.index_fund_value,
-                cashflow_surplus_index_fund_value=last.cashflow_surplus_index_fund_value
-            )
+        last = None
+        for month in range(0, self.size()):
+            last = self._row(month, None if last is None else vars(last))
             yield last
+
+    def size(self):
+        return len(self._home_investment.mortgage.schedule) + 1
+
+    def _timeline(self, columns):
+        # Only the given columns and the columns they are computed from, without a RowMonth per month
+        loan_term_months = self._home_investment.mortgage.loan_term_months
+        with timed('breakdown.month.rows'):
+            values = breakdown_columns(self._home_investment, [name for name, _ in columns])
+            return Timeline.from_columns(values, columns, loan_term_months)
+
+    def _rows(self):
+        return self._timeline(self.columns)
+
+    def _view_rows(self, views):
+        return self._timeline(self._view_columns(views))
+
+    def _jump(self, last, start, end, growth) -> dict:
+        # The running totals of month end from the values of month start - 1, in closed form with growth_series(). Like
+        # in BreakdownForYearClosedForm, months start to end of a year before the last payment have the same cashflow,
+        # so the index funds grow by a geometric series
+        schedule = self._home_investment.mortgage.schedule
+        assert (start - 1) // c.MONTHS_PER_YEAR == (end - 1) // c.MONTHS_PER_YEAR and end < len(schedule)
+        powers, sums = growth
+        months = end - start + 1
+
+        month = month_values(self._home_investment, start, order=_JUMP_ORDER)
+        cashflow = month['monthly_cashflow']
+        return dict(
+            net_operating_cost=last['net_operating_cost'] + month['monthly_operating_cost'] * months,
+            net_income=last['net_income'] + month['monthly_income'] * months,
+            net_cashflow=last['net_cashflow'] + cashflow * months,
+            principle_paid=last['principle_paid'] + schedule.principle_between(start, end),
+            interest_paid=last['interest_paid'] + schedule.interest_between(start, end),
+            appreciated_price=last['appreciated_price'] + month['monthly_appreciation'] * months,
+            index_fund_value=last['index_fund_value'] * powers[months] + max(-cashflow, _ZERO) * sums[months],
+            cashflow_surplus_index_fund_value=(
+                    last['cashflow_surplus_index_fund_value'] * powers[months] + max(cashflow, _ZERO) * sums[months]
+            ),
+        )
+
+    def _checkpoint(self, month) -> RowMonth:
+        # The last checkpoint at or before a month. Each one is the row after the closed form jump over the months
+        # since the checkpoint before it, so month 240 takes 20 jumps instead of 240 rows
+        index = month // CHECKPOINT_MONTHS
+        growth = None
+        while len(self._checkpoints) <= index:
+            if not self._checkpoints:
+                self._checkpoints.append(self._row(0))
+                continue
+            if growth is None:
+                growth = growth_series(self._home_investment.index_fund_monthly_growth, CHECKPOINT_MONTHS)
+            row = self._checkpoints[-1]
+            end = row.month + CHECKPOINT_MONTHS
+            self._checkpoints.append(self._row(end, self._jump(vars(row), row.month + 1, end - 1, growth)))
+        return self._checkpoints[index]
+
+    def _window(self, start, stop) -> list[RowMonth]:
+        if start == stop:
+            return []
+        row = self._checkpoint(start)
+        rows = [row]
+        for month in range(row.month + 1, stop):
+            row = self._row(month, vars(row))
+            rows.append(row)
+        return rows[start - rows[0].month:]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Generator
+
+from src.breakdown.breakdownfor import BreakdownFor
+from src.breakdown.rowvectorized import RowVectorized
+from src.breakdown.timeline import Timeline
+from src.breakdown.vectorizedengine import breakdown_arrays, inputs
+from src.memorybudget import budgeted
+from src.profiling import timed
+
+if TYPE_CHECKING:
+    from src.homeinvestment import HomeInvestment
+
+
+class BreakdownForMonthVectorized(BreakdownFor):
+    def __init__(self, home_investment: HomeInvestment):
+        super().__init__(home_investment, 'month')
+
+    @budgeted
+    def _inputs(self):
+        return inputs(self._home_investment)
+
+    @budgeted
+    def _arrays(self):
+        with timed('breakdown.month.arrays'):
+            return breakdown_arrays(self._inputs())
+
+    def arrays(self, columns=None):
+        # Every column by default, otherwise only the requested columns and the columns they are computed from
+        if columns is None:
+            return self._arrays()
+        with timed('breakdown.month.arrays'):
+            return breakdown_arrays(self._inputs(), columns)
+
+    def _timeline(self, arrays, columns):
+        # The arrays' buffers as they are, without a RowVectorized or a Dollar per month
+        loan_term_months = self._home_investment.mortgage.loan_term_months
+        with timed('breakdown.month.rows'):
+            return Timeline.from_arrays(arrays, columns, loan_term_months)
+
+    def _rows(self):
+        return self._timeline(self.arrays(), self.columns)
+
+    def _view_rows(self, views):
+        columns = self._view_columns(views)
+        return self._timeline(self.arrays([name for name, _ in columns]), columns)
+
+    def size(self):
+        return len(self._home_investment.mortgage.schedule) + 1
+
+    def _window(self, start, stop) -> list[RowVectorized]:
+        # Every month is computed at once by the vectorized engine, a window only wraps the months it needs
+        arrays = self.arrays()
+        loan_term_months = self._home_investment.mortgage.loan_term_months
+        return [RowVectorized(arrays, index, loan_term_months) for index in range(start, stop)]
+
+    def generator(self) -> Generator[RowVectorized, None, None]:
+        arrays = self.arrays()
+        loan_term_months = self._home_investment.mortgage.loan_term_months
+        for index in range(len(arrays['month'])):
+            yield RowVectorized(arrays, index, loan_term_months)
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Generator
 
+import src.constants as c
 from src.breakdown.breakdownfor import BreakdownFor
+from src.breakdown.columns import MONTH_COLUMNS
 from src.breakdown.rowyear import RowYear
 
 if TYPE_CHECKING:
@@ -13,11 +15,34 @@ class BreakdownForYear(BreakdownFor):
     def __init__(self, home_investment: HomeInvestment):
         super().__init__(home_investment, 'year')
 
+    def _year_ends(self):
+        # Last month of each year, a year ends with a full year or the last month of the loan
+        loan_term_months = self._home_investment.mortgage.loan_term_months
+        return [
+            month for month in range(self._home_investment.breakdown.monthly.size())
+            if month == loan_term_months or month % c.MONTHS_PER_YEAR == 0
+        ]
+
+    def _years(self, columns, first_month, year_ends):
+        purchase = self._home_investment.purchase
+        start = 0
+        for end in year_ends:
+            yield RowYear({name: values[start:end - first_month + 1] for name, values in columns.items()}, purchase)
+            start = end - first_month + 1
+
     def generator(self) -> Generator[RowYear, None, None]:
-        months = []
-        for month_bd in self._home_investment.breakdown.monthly.generator():
-            months.append(month_bd)
+        monthly = self._home_investment.breakdown.monthly.list()
+        columns = {column.name: monthly.column(column.name) for column in MONTH_COLUMNS}
+        yield from self._years(columns, 0, self._year_ends())
+
+    def size(self):
+        return len(self._year_ends())
 
-            if month_bd.is_last_month() or month_bd.is_full_year():
-                yield RowYear(months, self._home_investment.purchase)
-                months = []
+    def _window(self, start, stop) -> list[RowYear]:
+        year_ends = self._year_ends()
+        if start == stop:
+            return []
+        first_month = year_ends[start - 1] + 1 if start > 0 else 0
+        months = self._home_investment.breakdown.monthly.window(first_month, year_ends[stop - 1] + 1)
+        columns = {column.name: [getattr(month, column.name) for month in months] for column in MONTH_COLUMNS}
+        return list(self._years(columns, first_month, year_ends[start:stop]))
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import itertools
+from typing import TYPE_CHECKING, Generator
+
+import src.constants as c
+from src.breakdown.breakdownfor import BreakdownFor
+from src.breakdown.columns import MONTH_COLUMNS
+from src.breakdown.rowyear import RowYear
+from src.decimal.dollar import Dollar
+from src.decimal.percent import Percent
+from src.helpers import growth_series
+
+if TYPE_CHECKING:
+    from src.homeinvestment import HomeInvestment
+
+_ZERO = Dollar(0)
+
+
+class BreakdownForYearClosedForm(BreakdownFor):
+    # Every monthly input but the mortgage payment is constant within a year, so a year is its first month's values
+    # times its number of months, the amortization's cumulative sums and a geometric series for the index funds
+    def __init__(self, home_investment: HomeInvestment):
+        super().__init__(home_investment, 'year')
+
+    def _year_ends(self):
+        # Last month of years 1 and on, the same years BreakdownForYear folds the monthly rows into
+        loan_term_months = self._home_investment.mortgage.loan_term_months
+        return [
+            month for month in range(1, len(self._home_investment.mortgage.schedule) + 1)
+            if month == loan_term_months or month % c.MONTHS_PER_YEAR == 0
+        ]
+
+    def generator(self) -> Generator[RowYear, None, None]:
+        home_investment = self._home_investment
+        purchase, sale = home_investment.purchase, home_investment.sale
+        taxes, income = home_investment.taxes, home_investment.income
+        operating_expenses, mortgage = home_investment.operating_expenses, home_investment.mortgage
+        schedule = mortgage.schedule
+        growth = home_investment.index_fund_monthly_growth
+        powers, sums = growth_series(growth, c.MONTHS_PER_YEAR)
+
+        # Year 0 is the closing date alone
+        month_0 = home_investment.breakdown.monthly.at(0)
+        yield RowYear({column.name: [getattr(month_0, column.name)] for column in MONTH_COLUMNS}, purchase)
+        last = {column.name: getattr(month_0, column.name) for column in MONTH_COLUMNS}
+
+        start = 1
+        for year, end in enumerate(self._year_ends(), 1):
+            months = end - start + 1
+            row = dict(year=year, month=end)
+            row['monthly_principle'] = schedule.principle_between(start, end)
+            row['monthly_interest'] = schedule.interest_between(start, end)
+            row['monthly_mortgage'] = row['monthly_principle'] + row['monthly_interest']
+            row['monthly_deductible_interest'] = mortgage.deductible_interest_between(start, end)
+
+            property_tax = taxes.property_tax[start]
+            hoi = operating_expenses.hoi[start]
+            hoa = operating_expenses.hoa[start]
+            vacancy = operating_expenses.vacancy(month=start)
+            maintenance = operating_expenses.maintenance[start]
+            management_fee = operating_expenses.management_fee(month=start)
+            operating_cost = sum([property_tax, hoi, hoa, vacancy, maintenance, management_fee])
+            expenses = sum([property_tax, hoi, hoa, maintenance])
+            tax_savings = income.tax_savings_per_month[start]
+            rent, tenant_rent = income.rent[start], income.tenant_rent[start]
+            monthly_income = tax_savings + rent + tenant_rent
+            monthly_adjusted_income = monthly_income - vacancy - management_fee
+            monthly_appreciation = sale.appreciation_per_month(year=year)
+            for name, value in (
+                    ('monthly_property_tax', property_tax),
+                    ('monthly_hoi', hoi),
+                    ('monthly_hoa', hoa),
+                    ('monthly_vacancy', vacancy),
+                    ('monthly_maintenance', maintenance),
+                    ('monthly_management_fee', management_fee),
+                    ('monthly_operating_cost', operating_cost),
+                    ('monthly_expenses', expenses),
+                    ('monthly_tax_savings', tax_savings),
+                    ('monthly_rent', rent),
+                    ('monthly_tenant_rent', tenant_rent),
+                    ('monthly_income', monthly_income),
+                    ('monthly_adjusted_income', monthly_adjusted_income),
+                    ('monthly_appreciation', monthly_appreciation),
+            ):
+                row[name] = value * months
+            row['monthly_cashflow'] = row['monthly_income'] - row['monthly_operating_cost'] - row['monthly_mortgage']
+
+            row['net_operating_cost'] = last['net_operating_cost'] + row['monthly_operating_cost']
+            row['net_income'] = last['net_income'] + row['monthly_income']
+            row['net_cashflow'] = last['net_cashflow'] + row['monthly_cashflow']
+            row['appreciated_price'] = last['appreciated_price'] + row['monthly_appreciation']
+            row['appreciation'] = row['appreciated_price'] - purchase.price
+            row['principle_paid'] = last['principle_paid'] + row['monthly_principle']
+            row['interest_paid'] = last['interest_paid'] + row['monthly_interest']
+            row['sale_closing_cost'] = row['appreciated_price'] * sale.closing_cost_rate
+            row['equity'] = row['appreciation'] + row['principle_paid'] + purchase.down_payment
+
+            surplus, index_fund = last['cashflow_surplus_index_fund_value'], last['index_fund_value']
+            if end < len(schedule):
+                # The payment, and so the cashflow, is the same every month before the last payment
+                cashflow = monthly_income - operating_cost - (schedule.principle[start] + schedule.interest[start])
+                surplus = surplus * powers[months] + max(cashflow, _ZERO) * sums[months]
+                index_fund = index_fund * powers[months] + max(-cashflow, _ZERO) * sums[months]
+            else:
+                for month in range(start, end + 1):
+                    cashflow = monthly_income - operating_cost - (schedule.principle[month] + schedule.interest[month])
+                    surplus = surplus * growth + max(cashflow, _ZERO)
+                    index_fund = index_fund * growth + max(-cashflow, _ZERO)
+            row['cashflow_surplus_index_fund_value'] = surplus
+            row['index_fund_value'] = index_fund
+
+            row['cash_to_receive'] = row['equity'] - row['sale_closing_cost']
+            row['home_investment_value'] = (
+                    row['cash_to_receive'] + surplus - row['net_operating_cost'] - row['interest_paid']
+            )
+            row['home_roi'] = Percent(row['home_investment_value'] / purchase.cost_initial * 100 - 100)
+            row['index_fund_roi'] = Percent(index_fund / purchase.cost_initial * 100 - 100)
+            row['score'] = Percent(row['home_investment_value'] / index_fund * 100 - 100)
+
+            yield RowYear({name: [value] for name, value in row.items()}, purchase)
+            last = row
+            start = end + 1
+
+    def size(self):
+        return len(self._year_ends()) + 1
+
+    def _window(self, start, stop) -> list[RowYear]:
+        # Years carry the accumulators of the year before, a window runs the years before it, which is only ~30 steps
+        return list(itertools.islice(self.generator(), start, stop))
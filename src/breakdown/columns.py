@@ -0,0 +1,101 @@
+from typing import Literal, NamedTuple
+
+ColumnKind = Literal['int', 'dollar', 'percent']
+# How the months of a year fold into its RowYear value
+Aggregate = Literal['sum', 'last', 'first']
+
+
+class Column(NamedTuple):
+    name: str
+    kind: ColumnKind
+    yearly: Aggregate
+
+    @property
+    def year_name(self):
+        return f'yearly_{self.name[8:]}' if self.name.startswith('monthly_') else self.name
+
+
+# Public RowMonth attributes in the order they are assigned, which is also the column order of BreakdownRow.dict()
+MONTH_COLUMNS: list[Column] = [
+    Column('year', 'int', 'last'),
+    Column('month', 'int', 'last'),
+    Column('monthly_principle', 'dollar', 'sum'),
+    Column('monthly_interest', 'dollar', 'sum'),
+    Column('monthly_mortgage', 'dollar', 'sum'),
+    Column('monthly_property_tax', 'dollar', 'sum'),
+    Column('monthly_hoi', 'dollar', 'sum'),
+    Column('monthly_hoa', 'dollar', 'sum'),
+    Column('monthly_vacancy', 'dollar', 'sum'),
+    Column('monthly_maintenance', 'dollar', 'sum'),
+    Column('monthly_management_fee', 'dollar', 'sum'),
+    Column('monthly_operating_cost', 'dollar', 'sum'),
+    Column('net_operating_cost', 'dollar', 'last'),
+    Column('monthly_expenses', 'dollar', 'sum'),
+    Column('monthly_deductible_interest', 'dollar', 'sum'),
+    Column('monthly_tax_savings', 'dollar', 'sum'),
+    Column('monthly_rent', 'dollar', 'sum'),
+    Column('monthly_tenant_rent', 'dollar', 'sum'),
+    Column('monthly_income', 'dollar', 'sum'),
+    Column('monthly_adjusted_income', 'dollar', 'sum'),
+    Column('net_income', 'dollar', 'last'),
+    Column('monthly_cashflow', 'dollar', 'sum'),
+    Column('net_cashflow', 'dollar', 'last'),
+    Column('appreciated_price', 'dollar', 'last'),
+    Column('monthly_appreciation', 'dollar', 'sum'),
+    Column('appreciation', 'dollar', 'last'),
+    Column('principle_paid', 'dollar', 'last'),
+    Column('interest_paid', 'dollar', 'last'),
+    Column('sale_closing_cost', 'dollar', 'last'),
+    Column('equity', 'dollar', 'last'),
+    Column('cashflow_surplus_index_fund_value', 'dollar', 'last'),
+    Column('cash_to_receive', 'dollar', 'last'),
+    Column('home_investment_value', 'dollar', 'last'),
+    Column('index_fund_value', 'dollar', 'last'),
+    Column('home_roi', 'percent', 'last'),
+    Column('index_fund_roi', 'percent', 'last'),
+    Column('score', 'percent', 'last'),
+]
+
+YEAR_COLUMNS: list[tuple[str, ColumnKind]] = [(column.year_name, column.kind) for column in MONTH_COLUMNS] + [
+    ('cash_on_cash_return', 'percent'),
+]
+
+
+def dependency_order(graph, columns=None) -> list[str]:
+    # The requested columns of a column graph, name to (dependencies, function), and everything they are computed from,
+    # each after its dependencies
+    order, seen = [], set()
+
+    def visit(name):
+        if name in seen:
+            return
+        seen.add(name)
+        for dependency in graph[name][0]:
+            visit(dependency)
+        order.append(name)
+
+    for name in graph if columns is None else columns:
+        assert name in graph, f'Unknown breakdown column {name}'
+        visit(name)
+    return order
+
+
+def dict_key(name):
+    # Column name in BreakdownRow.dict() and the exports, without the monthly_/yearly_ prefix
+    if name.startswith('monthly_'):
+        return name[8:]
+    if name.startswith('yearly_'):
+        return name[7:]
+    return name
+
+
+def _keys(columns):
+    # monthly_appreciation and appreciation share a key, the later attribute wins but the key keeps its first position
+    keys = {}
+    for name, kind in columns:
+        keys[dict_key(name)] = (name, kind)
+    return keys
+
+
+MONTH_KEYS: dict[str, tuple[str, ColumnKind]] = _keys((column.name, column.kind) for column in MONTH_COLUMNS)
+YEAR_KEYS: dict[str, tuple[str, ColumnKind]] = _keys(YEAR_COLUMNS)
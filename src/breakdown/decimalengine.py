@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+
+import src.constants as c
+from src.breakdown.columns import dependency_order
+from src.decimal.dollar import Dollar
+from src.decimal.percent import Percent
+
+if TYPE_CHECKING:
+    from src.homeinvestment import HomeInvestment
+
+# The arithmetic of a month of the Decimal engine, one column at a time. RowMonth evaluates every column of a month,
+# view exports evaluate only the columns they write for every month
+
+# Column name to the columns it is computed from and a function of the HomeInvestment, the month's values so far and
+# the values of the month before, which the running totals add to
+GRAPH: dict[str, tuple[tuple[str, ...], Callable[[HomeInvestment, dict, dict], object]]] = {}
+
+# Running totals carried from month to month, the month before the closing month has none
+RUNNING_TOTALS = (
+    'net_operating_cost',
+    'net_income',
+    'net_cashflow',
+    'principle_paid',
+    'interest_paid',
+    'appreciated_price',
+    'index_fund_value',
+    'cashflow_surplus_index_fund_value',
+)
+NO_TOTALS = {name: Dollar(0) for name in RUNNING_TOTALS}
+
+
+def _column(name, *dependencies):
+    def register(f):
+        GRAPH[name] = (dependencies, f)
+        return f
+
+    return register
+
+
+def _sum(*names):
+    return lambda h, v, last: sum([v[name] for name in names])
+
+
+def _payment(values):
+    # Mortgage payments, the closing month has none
+    return lambda h, v, last: Dollar(0) if v['month'] == 0 else values(h)[v['month']]
+
+
+def _index_fund(h, v, last, name, deposit):
+    # Grows every month after the closing month and takes the deposit, if any
+    value = last[name]
+    if v['month'] != 0:
+        value *= h.index_fund_monthly_growth
+    if deposit is not None:
+        value += deposit
+    return value
+
+
+# Time, month is given
+_column('month')(lambda h, v, last: v['month'])
+_column('year', 'month')(lambda h, v, last: 0 if v['month'] == 0 else (v['month'] - 1) // c.MONTHS_PER_YEAR + 1)
+
+# Cashflow Negative
+_column('monthly_principle', 'month')(_payment(lambda h: h.mortgage.schedule.principle))
+_column('monthly_interest', 'month')(_payment(lambda h: h.mortgage.schedule.interest))
+_column('monthly_mortgage', 'monthly_principle', 'monthly_interest')(
+    lambda h, v, last: v['monthly_principle'] + v['monthly_interest']
+)
+_column('monthly_property_tax', 'month')(lambda h, v, last: h.taxes.property_tax[v['month']])
+_column('monthly_hoi', 'month')(lambda h, v, last: h.operating_expenses.hoi[v['month']])
+_column('monthly_hoa', 'month')(lambda h, v, last: h.operating_expenses.hoa[v['month']])
+_column('monthly_vacancy', 'month')(lambda h, v, last: h.operating_expenses.vacancy(month=v['month']))
+_column('monthly_maintenance', 'month')(lambda h, v, last: h.operating_expenses.maintenance[v['month']])
+_column('monthly_management_fee', 'month')(lambda h, v, last: h.operating_expenses.management_fee(month=v['month']))
+_OPERATING_COSTS = (
+    'monthly_property_tax',
+    'monthly_hoi',
+    'monthly_hoa',
+    'monthly_vacancy',
+    'monthly_maintenance',
+    'monthly_management_fee',
+)
+_column('monthly_operating_cost', *_OPERATING_COSTS)(_sum(*_OPERATING_COSTS))
+_column('net_operating_cost', 'monthly_operating_cost')(
+    lambda h, v, last: v['monthly_operating_cost'] + last['net_operating_cost']
+)
+_EXPENSES = ('monthly_property_tax', 'monthly_hoi', 'monthly_hoa', 'monthly_maintenance')
+_column('monthly_expenses', *_EXPENSES)(_sum(*_EXPENSES))
+
+# Cashflow Positive
+_column('monthly_deductible_interest', 'month')(_payment(lambda h: h.mortgage.deductible_interest))
+_column('monthly_tax_savings', 'month')(lambda h, v, last: h.income.tax_savings_per_month[v['month']])
+_column('monthly_rent', 'month')(lambda h, v, last: h.income.rent[v['month']])
+_column('monthly_tenant_rent', 'month')(lambda h, v, last: h.income.tenant_rent[v['month']])
+_column('monthly_income', 'monthly_tax_savings', 'monthly_rent', 'monthly_tenant_rent')(
+    lambda h, v, last: v['monthly_tax_savings'] + v['monthly_rent'] + v['monthly_tenant_rent']
+)
+_column('monthly_adjusted_income', 'monthly_income', 'monthly_vacancy', 'monthly_management_fee')(
+    lambda h, v, last: v['monthly_income'] - v['monthly_vacancy'] - v['monthly_management_fee']
+)
+
+# Cashflow
+_column('net_income', 'monthly_income')(lambda h, v, last: last['net_income'] + v['monthly_income'])
+_column('monthly_cashflow', 'month', 'monthly_income', 'monthly_operating_cost', 'monthly_mortgage')(
+    lambda h, v, last: -(h.purchase.down_payment + h.purchase.closing_cost) if v['month'] == 0 else (
+            v['monthly_income'] - v['monthly_operating_cost'] - v['monthly_mortgage']
+    )
+)
+_column('net_cashflow', 'monthly_cashflow')(lambda h, v, last: last['net_cashflow'] + v['monthly_cashflow'])
+
+# Home Investment Value
+_column('monthly_appreciation', 'year')(lambda h, v, last: h.sale.appreciation_per_month(year=v['year']))
+_column('appreciated_price', 'month', 'monthly_appreciation')(
+    lambda h, v, last: (h.purchase.price if v['month'] == 0 else last['appreciated_price']) + v['monthly_appreciation']
+)
+_column('appreciation', 'appreciated_price')(lambda h, v, last: v['appreciated_price'] - h.purchase.price)
+_column('principle_paid', 'monthly_principle')(lambda h, v, last: last['principle_paid'] + v['monthly_principle'])
+_column('interest_paid', 'monthly_interest')(lambda h, v, last: last['interest_paid'] + v['monthly_interest'])
+_column('sale_closing_cost', 'appreciated_price')(lambda h, v, last: v['appreciated_price'] * h.sale.closing_cost_rate)
+_column('equity', 'appreciation', 'principle_paid')(
+    lambda h, v, last: v['appreciation'] + v['principle_paid'] + h.purchase.down_payment
+)
+_column('cashflow_surplus_index_fund_value', 'month', 'monthly_cashflow')(lambda h, v, last: _index_fund(
+    h, v, last, 'cashflow_surplus_index_fund_value', v['monthly_cashflow'] if v['monthly_cashflow'] > 0 else None
+))
+_column('cash_to_receive', 'equity', 'sale_closing_cost')(lambda h, v, last: v['equity'] - v['sale_closing_cost'])
+_column(
+    'home_investment_value', 'cash_to_receive', 'cashflow_surplus_index_fund_value', 'net_operating_cost',
+    'interest_paid',
+)(lambda h, v, last: (
+        v['cash_to_receive'] + v['cashflow_surplus_index_fund_value'] - v['net_operating_cost'] - v['interest_paid']
+))
+
+# Index Fund Value
+_column('index_fund_value', 'month', 'monthly_cashflow')(lambda h, v, last: _index_fund(
+    h, v, last, 'index_fund_value', abs(v['monthly_cashflow']) if v['monthly_cashflow'] < 0 else None
+))
+
+# Home Investment vs Index Fund ROI Comparison
+_column('home_roi', 'home_investment_value')(
+    lambda h, v, last: Percent(v['home_investment_value'] / h.purchase.cost_initial * 100 - 100)
+)
+_column('index_fund_roi', 'index_fund_value')(
+    lambda h, v, last: Percent(v['index_fund_value'] / h.purchase.cost_initial * 100 - 100)
+)
+_column('score', 'home_investment_value', 'index_fund_value')(
+    lambda h, v, last: Percent(v['home_investment_value'] / v['index_fund_value'] * 100 - 100)
+)
+
+_ORDER = dependency_order(GRAPH)
+
+
+def month_values(home_investment: HomeInvestment, month, last=None, order=_ORDER) -> dict:
+    # The values of the columns in order, which defaults to all of them, of a month. last holds the running totals of
+    # the month before, the closing month's start from NO_TOTALS
+    values = dict(month=month)
+    last = NO_TOTALS if last is None else last
+    for name in order:
+        values[name] = GRAPH[name][1](home_investment, values, last)
+    return values
+
+
+def breakdown_columns(home_investment: HomeInvestment, columns=None) -> dict[str, list]:
+    # Every month of the requested columns and the columns they depend on, all of them by default
+    order = dependency_order(GRAPH, columns)
+    cols = {name: [] for name in order}
+    last = None
+    for month in range(len(home_investment.mortgage.schedule) + 1):
+        last = month_values(home_investment, month, last, order)
+        for name in order:
+            cols[name].append(last[name])
+    return cols
@@ -0,0 +1,113 @@
+import csv
+from typing import Iterable, Literal
+
+from src.breakdown.columns import ColumnKind
+from src.breakdown.row import BreakdownRow
+from src.breakdown.timeline import Timeline
+from src.decimal.decimal import CustomDecimal
+
+ExportFormat = Literal['csv', 'parquet', 'arrow']
+EXTENSIONS = dict(csv='csv', parquet='parquet', arrow='arrow')
+
+# Rows buffered per parquet row group / arrow record batch
+BATCH_ROWS = 1024
+
+_ARROW_TYPES = dict(int='int64', dollar='float64', percent='float64')
+
+
+def _csv_value(v):
+    if v is None:
+        return ''
+    return f'{v}' if isinstance(v, CustomDecimal) else v
+
+
+def _native_value(v):
+    if v is None:
+        return None
+    return float(v) if isinstance(v, CustomDecimal) else v
+
+
+class _CsvWriter(object):
+    def __init__(self, path, columns):
+        self._columns = columns
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file, lineterminator='\n')
+        self._writer.writerow(columns)
+
+    def write(self, values):
+        self._writer.writerow([values[k] for k in self._columns])
+
+    def close(self):
+        self._file.close()
+
+
+class _ArrowWriter(object):
+    def __init__(self, path, columns, kinds, fmt):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(f'Exporting to {fmt} requires pyarrow, pip install pyarrow') from e
+
+        self._pa = pa
+        self._columns = columns
+        self._schema = pa.schema([(k, getattr(pa, _ARROW_TYPES[kinds[k]])()) for k in columns])
+        self._batch = {k: [] for k in columns}
+        if fmt == 'parquet':
+            self._writer = pq.ParquetWriter(path, self._schema)
+        else:
+            self._sink = pa.OSFile(path, 'wb')
+            self._writer = pa.ipc.new_file(self._sink, self._schema)
+
+    def write(self, values):
+        for k in self._columns:
+            self._batch[k].append(values[k])
+        if len(self._batch[self._columns[0]]) >= BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        if self._batch[self._columns[0]]:
+            self._writer.write_batch(self._pa.record_batch(list(self._batch.values()), schema=self._schema))
+            self._batch = {k: [] for k in self._columns}
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+        if hasattr(self, '_sink'):
+            self._sink.close()
+
+
+def _values(rows, needed, to_value):
+    # A Timeline is read column by column, which is much faster than one attribute of a row view at a time
+    if isinstance(rows, Timeline):
+        columns = {k: [to_value(v) for v in rows.column(name)] for k, name in needed.items()}
+        return (dict(zip(columns, values)) for values in zip(*columns.values()))
+    return ({k: to_value(getattr(row, name, None)) for k, name in needed.items()} for row in rows)
+
+
+def write_views(
+        rows: Iterable[BreakdownRow],
+        outputs: dict[str, list[str]],
+        keys: dict[str, tuple[str, ColumnKind]],
+        fmt: ExportFormat = 'csv',
+):
+    # Streams rows once, writing every output path with its own subset of columns
+    kinds = {k: kind for k, (_, kind) in keys.items()}
+    needed = {k: keys[k][0] for columns in outputs.values() for k in columns}
+    to_value = _csv_value if fmt == 'csv' else _native_value
+    writers = []
+    try:
+        for path, columns in outputs.items():
+            if fmt == 'csv':
+                writers.append(_CsvWriter(path, columns))
+            else:
+                writers.append(_ArrowWriter(path, columns, kinds, fmt))
+
+        for values in _values(rows, needed, to_value):
+            for writer in writers:
+                writer.write(values)
+    finally:
+        for writer in writers:
+            writer.close()
+
+    return list(outputs)
@@ -1,17 +1,31 @@
 from __future__ import annotations
 
-import functools
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 
 from src.breakdown.breakdownformonth import BreakdownForMonth
 from src.breakdown.breakdownforyear import BreakdownForYear
+from src.breakdown.breakdownforyearclosedform import BreakdownForYearClosedForm
 
 if TYPE_CHECKING:
     from src.homeinvestment import HomeInvestment
 
+# yearly computes the yearly breakdown from closed form yearly sums, the monthly breakdown falls back to decimal
+BreakdownEngine = Literal['decimal', 'vectorized', 'yearly']
+
 
 class InvestmentBreakdown(object):
-    def __init__(self, home_investment: HomeInvestment):
+    def __init__(self, home_investment: HomeInvestment, engine: BreakdownEngine = 'decimal'):
+        assert engine in ('decimal', 'vectorized', 'yearly'), f'Unknown breakdown engine {engine}'
         self._home_investment = home_investment
-        self.monthly = BreakdownForMonth(home_investment)
-        self.yearly = BreakdownForYear(home_investment)
+        self.engine = engine
+        if engine == 'vectorized':
+            # Imported here so that numpy is only loaded by callers of the vectorized engine
+            from src.breakdown.breakdownformonthvectorized import BreakdownForMonthVectorized
+
+            self.monthly = BreakdownForMonthVectorized(home_investment)
+        else:
+            self.monthly = BreakdownForMonth(home_investment)
+        if engine == 'yearly':
+            self.yearly = BreakdownForYearClosedForm(home_investment)
+        else:
+            self.yearly = BreakdownForYear(home_investment)
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import src.constants as c
+from src.breakdown.columns import MONTH_COLUMNS
+from src.breakdown.row import BreakdownRow
+from src.decimal.dollar import Dollar
+from src.decimal.percent import Percent
+
+WRAP = dict(int=int, dollar=Dollar, percent=Percent)
+
+
+class RowVectorized(BreakdownRow):
+    def __init__(self, arrays, index, loan_term_months):
+        self._loan_term_months = loan_term_months
+        for column in MONTH_COLUMNS:
+            setattr(self, column.name, WRAP[column.kind](arrays[column.name][index].item()))
+
+    def is_last_month(self):
+        return self._loan_term_months == self.month
+
+    def is_full_year(self):
+        return self.month % c.MONTHS_PER_YEAR == 0
+
+    def is_new_year(self):
+        return self.month % c.MONTHS_PER_YEAR == 1
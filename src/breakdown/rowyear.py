@@ -1,21 +1,23 @@
+import operator
+from functools import reduce
+
+from src.breakdown.columns import MONTH_COLUMNS
 from src.breakdown.row import BreakdownRow
-from src.breakdown.rowmonth import RowMonth
 from src.decimal.percent import Percent
 from src.purchase import Purchase
 
+AGGREGATES = dict(
+    sum=lambda values: reduce(operator.__add__, values),
+    last=lambda values: values[-1],
+    first=lambda values: values[0],
+)
 
-class RowYear(BreakdownRow):
-    def __init__(self, months: list[RowMonth], purchase: Purchase):
-        for idx, month in enumerate(months):
-            for month_k, v in month.__dict__.items():
-                if month_k.startswith('_'):
-                    continue
 
-                year_k = f'yearly_{month_k[8:]}' if month_k.startswith('monthly_') else month_k
-                if month_k.startswith('monthly_') and not idx == 0:
-                    setattr(self, year_k, getattr(self, year_k) + v)
-                else:
-                    setattr(self, year_k, v)
+class RowYear(BreakdownRow):
+    def __init__(self, months: dict[str, list], purchase: Purchase):
+        # Month column name to its values for the months of the year
+        for column in MONTH_COLUMNS:
+            setattr(self, column.year_name, AGGREGATES[column.yearly](months[column.name]))
 
-            if self.year != 0:
-                self.cash_on_cash_return = Percent(self.yearly_cashflow / purchase.cost_initial * 100)
+        if self.year != 0:
+            self.cash_on_cash_return = Percent(self.yearly_cashflow / purchase.cost_initial * 100)
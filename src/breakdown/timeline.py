@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import zlib
+
+import src.constants as c
+from src.breakdown.columns import ColumnKind, dict_key
+from src.breakdown.row import BreakdownRow
+from src.decimal.dollar import Dollar
+from src.decimal.percent import Percent
+
+# Serialized timelines are a json header padded to 8 bytes, then each column's validity bitmap padded to 8 bytes and
+# its values, so an uncompressed body can be read in place from a memoryview or mmap
+MAGIC = b'HPCROWS2'
+# Column encodings and their widths. 'scaled' is the exact 16 byte fixed point value of a Dollar or Percent, which does
+# not fit an int64, 'cents' rounds dollars to int64 cents and 'float64' stores doubles
+WIDTHS = dict(int64=8, scaled=16, cents=8, float64=8)
+# Encoding of each column kind at each precision
+PRECISIONS = dict(
+    exact=dict(int='int64', dollar='scaled', percent='scaled'),
+    cents=dict(int='int64', dollar='cents', percent='float64'),
+    float64=dict(int='int64', dollar='float64', percent='float64'),
+)
+_WRAP = dict(int=int, dollar=Dollar, percent=Percent)
+_ALIGNMENT = 8
+
+
+def _padded(length):
+    return -(-length // _ALIGNMENT) * _ALIGNMENT
+
+
+class TimelineRow(BreakdownRow):
+    # A view of one row of a Timeline, with the attributes of the row it was built from
+    __slots__ = ('_timeline', '_index')
+
+    def __init__(self, timeline: Timeline, index):
+        self._timeline = timeline
+        self._index = index
+
+    def __getattr__(self, name):
+        # Only called for the row's columns, _timeline and _index are slots
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return self._timeline.value(name, self._index)
+
+    def dict(self):
+        return self._timeline.dict(self._index)
+
+    def is_last_month(self):
+        return self._timeline.loan_term_months == self.month
+
+    def is_full_year(self):
+        return self.month % c.MONTHS_PER_YEAR == 0
+
+    def is_new_year(self):
+        return self.month % c.MONTHS_PER_YEAR == 1
+
+
+class Timeline(object):
+    # Rows of a breakdown stored column by column in fixed width buffers instead of one object per row and value
+    __slots__ = ('columns', 'loan_term_months', 'encodings', '_positions', '_values', '_valid', '_length')
+
+    def __init__(self, columns: list[tuple[str, ColumnKind]], loan_term_months, encodings=None):
+        self.columns = [(name, kind) for name, kind in columns]
+        self.loan_term_months = loan_term_months
+        self.encodings = encodings or [PRECISIONS['exact'][kind] for _, kind in self.columns]
+        self._positions = {name: position for position, (name, _) in enumerate(self.columns)}
+        self._values = [bytearray() for _ in self.columns]
+        self._valid = [bytearray() for _ in self.columns]
+        self._length = 0
+
+    @classmethod
+    def from_rows(cls, rows, columns, loan_term_months, precision='exact'):
+        # A row without an attribute, like cash_on_cash_return of year 0, leaves it unset
+        columns = [(name, kind) for name, kind in columns]
+        values = {name: [] for name, _ in columns}
+        for row in rows:
+            for name, _ in columns:
+                values[name].append(getattr(row, name, None))
+        return cls.from_columns(values, columns, loan_term_months, precision)
+
+    @classmethod
+    def from_columns(cls, values: dict[str, list], columns, loan_term_months, precision='exact'):
+        # Column name to its values, where None is unset
+        columns = [(name, kind) for name, kind in columns]
+        timeline = cls(columns, loan_term_months, [PRECISIONS[precision][kind] for _, kind in columns])
+        timeline._length = n = len(values[columns[0][0]]) if columns else 0
+        for position, ((name, kind), encoding) in enumerate(zip(columns, timeline.encodings)):
+            column = values[name]
+            assert len(column) == n, f'Column {name} has {len(column)} rows, not {n}'
+            valid = bytearray((n + 7) // 8)
+            for index, value in enumerate(column):
+                if value is not None:
+                    valid[index // 8] |= 1 << index % 8
+            timeline._valid[position] = valid
+            if encoding == 'scaled':
+                scaled = (0 if v is None else v.scaled for v in column)
+                timeline._values[position] = bytearray(b''.join(v.to_bytes(16, 'little', signed=True) for v in scaled))
+            elif encoding == 'float64':
+                timeline._values[position] = bytearray(struct.pack(f'<{n}d', *(0 if v is None else v for v in column)))
+            else:
+                cents = encoding == 'cents'
+                ints = (0 if v is None else v.cents if cents else v for v in column)
+                timeline._values[position] = bytearray(struct.pack(f'<{n}q', *ints))
+        return timeline
+
+    @classmethod
+    def from_arrays(cls, arrays, columns, loan_term_months):
+        # Numpy arrays of the vectorized engine, stored as their int64 and float64 buffers without converting a value
+        columns = [(name, kind) for name, kind in columns]
+        timeline = cls(columns, loan_term_months, [PRECISIONS['float64'][kind] for _, kind in columns])
+        timeline._length = n = len(arrays[columns[0][0]]) if columns else 0
+        valid = bytes([0xff]) * (n // 8) + (bytes([(1 << n % 8) - 1]) if n % 8 else b'')
+        for position, ((name, _), encoding) in enumerate(zip(columns, timeline.encodings)):
+            timeline._valid[position] = valid
+            timeline._values[position] = arrays[name].astype('<i8' if encoding == 'int64' else '<f8').tobytes()
+        return timeline
+
+    def astype(self, precision):
+        # A copy stored at another precision, e.g. 'cents' for a compact, lossy copy of an exact timeline
+        values = {name: self.column(name) for name, _ in self.columns}
+        return Timeline.from_columns(values, self.columns, self.loan_term_months, precision)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return (TimelineRow(self, index) for index in range(self._length))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [TimelineRow(self, i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f'Row {index} of a timeline of {self._length} rows')
+        return TimelineRow(self, index)
+
+    def value(self, name, index):
+        position = self._positions.get(name)
+        if position is None or not self._valid[position][index // 8] >> index % 8 & 1:
+            raise AttributeError(name)
+        kind, encoding, values = self.columns[position][1], self.encodings[position], self._values[position]
+        if encoding == 'scaled':
+            return _WRAP[kind].from_scaled(int.from_bytes(values[index * 16:(index + 1) * 16], 'little', signed=True))
+        (v,) = struct.unpack_from('<d' if encoding == 'float64' else '<q', values, index * 8)
+        return Dollar.from_cents(v) if encoding == 'cents' else _WRAP[kind](v)
+
+    def column(self, name):
+        # Every value of a column, None where it is unset, decoded in one pass
+        position = self._positions[name]
+        kind, encoding = self.columns[position][1], self.encodings[position]
+        valid, values = self._valid[position], self._values[position]
+        if encoding == 'scaled':
+            # 16 byte little endian values are an unsigned low and a signed high int64
+            from_scaled = _WRAP[kind].from_scaled
+            decoded = [from_scaled(high << 64 | low) for low, high in struct.iter_unpack('<Qq', values)]
+        else:
+            decoded = struct.unpack(f'<{self._length}{"d" if encoding == "float64" else "q"}', values)
+            if kind != 'int':
+                decoded = list(map(Dollar.from_cents if encoding == 'cents' else _WRAP[kind].from_float, decoded))
+        return [v if valid[i // 8] >> i % 8 & 1 else None for i, v in enumerate(decoded)]
+
+    def array(self, name):
+        # A numpy array of a column, 0 where it is unset. int64 and float64 columns are views of the timeline's buffer,
+        # even one read from an mmap, cents and scaled columns are converted to float64 dollars and percents
+        import numpy as np
+
+        position = self._positions[name]
+        encoding, values = self.encodings[position], self._values[position]
+        if encoding == 'scaled':
+            return np.array([float(v or 0) for v in self.column(name)])
+        array = np.frombuffer(values, '<f8' if encoding == 'float64' else '<i8')
+        return array / 100 if encoding == 'cents' else array
+
+    def dict(self, index):
+        # The same formatted dict as BreakdownRow.dict() of the row this one was built from
+        values = {}
+        for name, kind in self.columns:
+            try:
+                value = self.value(name, index)
+            except AttributeError:
+                continue
+            values[dict_key(name)] = value if kind == 'int' else f'{value}'
+        return values
+
+    def dicts(self):
+        columns = [
+            (dict_key(name), [v if kind == 'int' or v is None else f'{v}' for v in self.column(name)])
+            for name, kind in self.columns
+        ]
+        return [
+            {key: values[index] for key, values in columns if values[index] is not None}
+            for index in range(self._length)
+        ]
+
+    @property
+    def nbytes(self):
+        return sum(len(values) + len(valid) for values, valid in zip(self._values, self._valid))
+
+    def to_bytes(self, compress=False):
+        header = json.dumps(dict(
+            rows=self._length,
+            columns=[[name, kind, encoding] for (name, kind), encoding in zip(self.columns, self.encodings)],
+            loan_term_months=self.loan_term_months,
+            compressed=compress,
+        )).encode()
+        header += b' ' * (_padded(len(MAGIC) + 4 + len(header)) - len(MAGIC) - 4 - len(header))
+        body = b''.join(
+            bytes(valid) + b'\0' * (_padded(len(valid)) - len(valid)) + bytes(values)
+            for valid, values in zip(self._valid, self._values)
+        )
+        return MAGIC + struct.pack('<I', len(header)) + header + (zlib.compress(body) if compress else body)
+
+    @classmethod
+    def from_bytes(cls, data):
+        # Bytes, a memoryview or an mmap. An uncompressed body is not copied, the columns are views of data
+        data = memoryview(data)
+        assert data[:len(MAGIC)] == MAGIC, 'Not a serialized timeline'
+        offset = len(MAGIC)
+        (header_length,) = struct.unpack_from('<I', data, offset)
+        header = json.loads(bytes(data[offset + 4:offset + 4 + header_length]))
+        body = data[offset + 4 + header_length:]
+        if header['compressed']:
+            body = memoryview(zlib.decompress(body))
+
+        columns = [(name, kind) for name, kind, _ in header['columns']]
+        timeline = cls(columns, header['loan_term_months'], [encoding for _, _, encoding in header['columns']])
+        n = timeline._length = header['rows']
+        position = 0
+        for index, encoding in enumerate(timeline.encodings):
+            valid_length, values_length = (n + 7) // 8, n * WIDTHS[encoding]
+            timeline._valid[index] = body[position:position + valid_length]
+            position += _padded(valid_length)
+            timeline._values[index] = body[position:position + values_length]
+            position += values_length
+        assert position == len(body), 'Truncated timeline'
+        return timeline
+
+    def __reduce__(self):
+        # Pickles as its buffers, e.g. when returned from process pool workers
+        return Timeline.from_bytes, (self.to_bytes(),)
+
+    def save(self, path, compress=False):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes(compress))
+
+    @classmethod
+    def load(cls, path):
+        # Mapped rather than read, only the pages of the columns that are used are read from disk
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f'{path} is empty')
+            return cls.from_bytes(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+import src.constants as c
+from src.breakdown.columns import MONTH_COLUMNS, dependency_order
+
+if TYPE_CHECKING:
+    from src.decimal.dollarcompounding import DollarCompYearly
+    from src.homeinvestment import HomeInvestment
+
+# Float64 results vs the Decimal engine. Both share the cent-rounded amortization schedule, so the only drift is float
+# rounding in the running sums and index fund compounding: well under a cent and a thousandth of a percentage point.
+TOLERANCE_DOLLARS = .01
+TOLERANCE_PERCENT = .001
+
+
+def compounding_yearly(initial_value, rate, years: np.ndarray) -> np.ndarray:
+    # DollarCompYearly[0] is $0, every other month uses the value compounded up to the start of its year
+    return np.where(years == 0, 0., initial_value * (1. + rate) ** np.maximum(years - 1, 0))
+
+
+def compound_cumsum(deposits: np.ndarray, growth: np.ndarray) -> np.ndarray:
+    # Solves v[m] = v[m - 1] * growth[m] + deposits[m] along the last axis in closed form
+    cumulative_growth = np.cumprod(growth, axis=-1)
+    return cumulative_growth * np.cumsum(deposits / cumulative_growth, axis=-1)
+
+
+def _comp_yearly(values: DollarCompYearly):
+    return float(values.initial_value), float(values.rate)
+
+
+def inputs(home_investment: HomeInvestment) -> dict:
+    # Everything breakdown_arrays needs from a HomeInvestment, as floats and month or year indexed arrays
+    purchase = home_investment.purchase
+    mortgage = home_investment.mortgage
+    taxes = home_investment.taxes
+    operating_expenses = home_investment.operating_expenses
+    income = home_investment.income
+    sale = home_investment.sale
+    schedule = mortgage.schedule.arrays
+    return dict(
+        principle=schedule['principle'],
+        interest=schedule['interest'],
+        deductible_interest=np.array(mortgage.deductible_interest, dtype=float),
+        tax_savings_per_year=np.array([float(v) for v in income.tax_savings_per_year]),
+        property_tax=_comp_yearly(taxes.property_tax),
+        hoi=_comp_yearly(operating_expenses.hoi),
+        hoa=_comp_yearly(operating_expenses.hoa),
+        maintenance=_comp_yearly(operating_expenses.maintenance),
+        rent=_comp_yearly(income.rent),
+        tenant_rent=_comp_yearly(income.tenant_rent),
+        vacancy_rate=float(income.vacancy_rate),
+        management_fee_rate=float(income.management_fee_rate),
+        price=float(purchase.price),
+        down_payment=float(purchase.down_payment),
+        closing_cost=float(purchase.closing_cost),
+        cost_initial=float(purchase.cost_initial),
+        annual_appreciation_rate=float(sale.annual_appreciation_rate),
+        sale_closing_cost_rate=float(sale.closing_cost_rate),
+        index_fund_annual_return_rate=float(home_investment.index_fund_annual_return_rate),
+    )
+
+
+def monthly_arrays(home_investment: HomeInvestment, columns=None) -> dict[str, np.ndarray]:
+    return breakdown_arrays(inputs(home_investment), columns)
+
+
+# Column name to the columns it is computed from and a function of the inputs and those columns. Names starting with _
+# are intermediate values that are not breakdown columns
+GRAPH: dict[str, tuple[tuple[str, ...], Callable[[dict, dict], np.ndarray]]] = {}
+
+
+def _column(name, *dependencies):
+    def register(f):
+        GRAPH[name] = (dependencies, f)
+        return f
+
+    return register
+
+
+def _sum(*names):
+    return lambda i, cols: sum(cols[name] for name in names)
+
+
+def _cumsum(name):
+    return lambda i, cols: np.cumsum(cols[name], axis=-1)
+
+
+def _comp_yearly_column(key):
+    return lambda i, cols: compounding_yearly(*i[key], cols['year'])
+
+
+# Time
+_column('month')(lambda i, cols: np.arange(i['principle'].shape[-1]))
+_column('year', 'month')(
+    lambda i, cols: np.where(cols['month'] == 0, 0, (cols['month'] - 1) // c.MONTHS_PER_YEAR + 1)
+)
+
+# Cashflow Negative
+_column('monthly_principle')(lambda i, cols: i['principle'])
+_column('monthly_interest')(lambda i, cols: i['interest'])
+_column('monthly_mortgage', 'monthly_principle', 'monthly_interest')(_sum('monthly_principle', 'monthly_interest'))
+_column('monthly_property_tax', 'year')(_comp_yearly_column('property_tax'))
+_column('monthly_hoi', 'year')(_comp_yearly_column('hoi'))
+_column('monthly_hoa', 'year')(_comp_yearly_column('hoa'))
+_column('monthly_tenant_rent', 'year')(_comp_yearly_column('tenant_rent'))
+_column('monthly_vacancy', 'monthly_tenant_rent')(lambda i, cols: i['vacancy_rate'] * cols['monthly_tenant_rent'])
+_column('monthly_maintenance', 'year')(_comp_yearly_column('maintenance'))
+_column('monthly_management_fee', 'monthly_tenant_rent', 'monthly_vacancy')(
+    lambda i, cols: i['management_fee_rate'] * (cols['monthly_tenant_rent'] - cols['monthly_vacancy'])
+)
+_OPERATING_COSTS = (
+    'monthly_property_tax',
+    'monthly_hoi',
+    'monthly_hoa',
+    'monthly_vacancy',
+    'monthly_maintenance',
+    'monthly_management_fee',
+)
+_column('monthly_operating_cost', *_OPERATING_COSTS)(_sum(*_OPERATING_COSTS))
+_column('net_operating_cost', 'monthly_operating_cost')(_cumsum('monthly_operating_cost'))
+_EXPENSES = ('monthly_property_tax', 'monthly_hoi', 'monthly_hoa', 'monthly_maintenance')
+_column('monthly_expenses', *_EXPENSES)(_sum(*_EXPENSES))
+
+# Cashflow Positive
+_column('monthly_deductible_interest')(lambda i, cols: i['deductible_interest'])
+_column('monthly_tax_savings', 'month', 'year')(lambda i, cols: np.where(
+    cols['month'] == 0, 0., i['tax_savings_per_year'][..., cols['year']] / c.MONTHS_PER_YEAR
+))
+_column('monthly_rent', 'year')(_comp_yearly_column('rent'))
+_INCOMES = ('monthly_tax_savings', 'monthly_rent', 'monthly_tenant_rent')
+_column('monthly_income', *_INCOMES)(_sum(*_INCOMES))
+_column('monthly_adjusted_income', 'monthly_income', 'monthly_vacancy', 'monthly_management_fee')(
+    lambda i, cols: cols['monthly_income'] - cols['monthly_vacancy'] - cols['monthly_management_fee']
+)
+
+# Cashflow
+_column('net_income', 'monthly_income')(_cumsum('monthly_income'))
+_column('monthly_cashflow', 'month', 'monthly_income', 'monthly_operating_cost', 'monthly_mortgage')(
+    lambda i, cols: np.where(
+        cols['month'] == 0,
+        -(i['down_payment'] + i['closing_cost']),
+        cols['monthly_income'] - cols['monthly_operating_cost'] - cols['monthly_mortgage'],
+    )
+)
+_column('net_cashflow', 'monthly_cashflow')(_cumsum('monthly_cashflow'))
+
+
+# Home Investment Value
+@_column('monthly_appreciation', 'year')
+def _monthly_appreciation(i, cols):
+    year = cols['year']
+    appreciated_by_year = i['price'] * (1. + i['annual_appreciation_rate']) ** np.arange(year[-1] + 1)
+    appreciation_per_year = np.diff(appreciated_by_year, axis=-1, prepend=appreciated_by_year[..., :1])
+    return appreciation_per_year[..., year] / c.MONTHS_PER_YEAR
+
+
+_column('appreciated_price', 'monthly_appreciation')(
+    lambda i, cols: i['price'] + np.cumsum(cols['monthly_appreciation'], axis=-1)
+)
+_column('appreciation', 'appreciated_price')(lambda i, cols: cols['appreciated_price'] - i['price'])
+_column('principle_paid', 'monthly_principle')(_cumsum('monthly_principle'))
+_column('interest_paid', 'monthly_interest')(_cumsum('monthly_interest'))
+_column('sale_closing_cost', 'appreciated_price')(
+    lambda i, cols: cols['appreciated_price'] * i['sale_closing_cost_rate']
+)
+_column('equity', 'appreciation', 'principle_paid')(
+    lambda i, cols: cols['appreciation'] + cols['principle_paid'] + i['down_payment']
+)
+_column('_index_fund_growth', 'month')(
+    lambda i, cols: np.where(cols['month'] == 0, 1., 1. + i['index_fund_annual_return_rate'] / c.MONTHS_PER_YEAR)
+)
+_column('cashflow_surplus_index_fund_value', 'monthly_cashflow', '_index_fund_growth')(
+    lambda i, cols: compound_cumsum(np.maximum(cols['monthly_cashflow'], 0.), cols['_index_fund_growth'])
+)
+_column('cash_to_receive', 'equity', 'sale_closing_cost')(lambda i, cols: cols['equity'] - cols['sale_closing_cost'])
+_column(
+    'home_investment_value', 'cash_to_receive', 'cashflow_surplus_index_fund_value', 'net_operating_cost',
+    'interest_paid',
+)(lambda i, cols: (
+        cols['cash_to_receive']
+        + cols['cashflow_surplus_index_fund_value']
+        - cols['net_operating_cost']
+        - cols['interest_paid']
+))
+
+# Index Fund Value
+_column('index_fund_value', 'monthly_cashflow', '_index_fund_growth')(
+    lambda i, cols: compound_cumsum(np.maximum(-cols['monthly_cashflow'], 0.), cols['_index_fund_growth'])
+)
+
+# Home Investment vs Index Fund ROI Comparison
+_column('home_roi', 'home_investment_value')(
+    lambda i, cols: cols['home_investment_value'] / i['cost_initial'] * 100 - 100
+)
+_column('index_fund_roi', 'index_fund_value')(lambda i, cols: cols['index_fund_value'] / i['cost_initial'] * 100 - 100)
+_column('score', 'home_investment_value', 'index_fund_value')(
+    lambda i, cols: cols['home_investment_value'] / cols['index_fund_value'] * 100 - 100
+)
+
+
+def evaluation_order(columns=None) -> list[str]:
+    return dependency_order(GRAPH, columns)
+
+
+def breakdown_arrays(i: dict, columns=None) -> dict[str, np.ndarray]:
+    # Month is the last axis. Scalar inputs give the columns of one scenario, inputs with a leading scenarios axis,
+    # e.g. (scenarios x 1) floats with (scenarios x months) schedules, give (scenarios x months) columns. Only the
+    # requested columns and the columns they depend on are computed, all of them by default
+    cols = {}
+    for name in evaluation_order(columns):
+        cols[name] = GRAPH[name][1](i, cols)
+    return {name: values for name, values in cols.items() if not name.startswith('_')}
+
+
+def yearly_arrays(months: dict[str, np.ndarray], loan_term_months, cost_initial) -> dict[str, np.ndarray]:
+    # Folds one scenario's monthly columns into the columns of its yearly breakdown, the way RowYear folds the months
+    # of a year: year 0 is the closing month, later years end with a full year or the last month of the loan
+    month = months['month']
+    ends = np.flatnonzero((month == loan_term_months) | (month % c.MONTHS_PER_YEAR == 0))
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    years = {}
+    for column in MONTH_COLUMNS:
+        values = months[column.name]
+        if column.yearly == 'sum':
+            years[column.year_name] = np.add.reduceat(values, starts)
+        else:
+            years[column.year_name] = values[ends if column.yearly == 'last' else starts]
+    cash_on_cash_return = years['yearly_cashflow'] / cost_initial * 100
+    years['cash_on_cash_return'] = np.where(years['year'] == 0, np.nan, cash_on_cash_return)
+    return years
@@ -1,9 +1,89 @@
+import numbers
 from decimal import Decimal
 
 import src.constants as c
 
+# Values are stored as integers scaled by 10 ** SCALE_DIGITS, which keeps arithmetic on Dollar and Percent close to int
+# speed while staying exact far below the cent
+SCALE_DIGITS = 16
+SCALE = 10 ** SCALE_DIGITS
+
+
+def _scaled(value):
+    if isinstance(value, CustomDecimal):
+        return value._v
+    if isinstance(value, int) or isinstance(value, numbers.Integral):
+        return int(value) * SCALE
+    # A float is the exact ratio Decimal(value) would give, without building the Decimal
+    numerator, denominator = value.as_integer_ratio() if value.__class__ is float else Decimal(value).as_integer_ratio()
+    return _div_round(numerator * SCALE, denominator)
+
+
+def _operands(v, other):
+    # v and other scaled to a common denominator without rounding, so comparisons with floats and Decimals are exact
+    # like Decimal's and agree with hash()
+    if isinstance(other, CustomDecimal):
+        return v, other._v
+    if isinstance(other, int):
+        return v, other * SCALE
+    numerator, denominator = other.as_integer_ratio() if other.__class__ is float else Decimal(other).as_integer_ratio()
+    return v * denominator, numerator * SCALE
+
+
+def _div_round(numerator, denominator):
+    # Integer division rounding half to even, the same rounding Decimal uses by default
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    quotient, remainder = divmod(numerator, denominator)
+    twice_remainder = remainder + remainder
+    if twice_remainder > denominator or (twice_remainder == denominator and quotient & 1):
+        quotient += 1
+    return quotient
+
+
+def _from_scaled(cls, v):
+    self = object.__new__(cls)
+    self._v = v
+    return self
+
+
+class CustomDecimal(object):
+    __slots__ = ('_v',)
+
+    def __new__(cls, value=0):
+        if value.__class__ is cls:
+            return value
+        return _from_scaled(cls, _scaled(value))
+
+    def __reduce__(self):
+        return _from_scaled, (self.__class__, self._v)
+
+    @classmethod
+    def from_scaled(cls, v):
+        return _from_scaled(cls, v)
+
+    @property
+    def scaled(self):
+        # The value as an integer number of 10 ** -SCALE_DIGITS units
+        return self._v
+
+    @classmethod
+    def from_float(cls, value):
+        # cls(value) for a float without the type checks, for decoding float columns in bulk
+        numerator, denominator = value.as_integer_ratio()
+        return _from_scaled(cls, _div_round(numerator * SCALE, denominator))
+
+    @classmethod
+    def from_cents(cls, cents):
+        return _from_scaled(cls, cents * (SCALE // 100))
+
+    @property
+    def cents(self):
+        return _div_round(self._v, SCALE // 100)
+
+    def to_decimal(self):
+        return Decimal(self._v).scaleb(-SCALE_DIGITS)
 
-class CustomDecimal(Decimal):
     def to_str_2_digits(self):
         f = self.tenth_place_quantize().__float__()
         str_number = format(f, ',')
@@ -18,4 +98,109 @@ class CustomDecimal(Decimal):
         return f'{integer_part}.{fractional_part}' if fractional_part else integer_part
 
     def tenth_place_quantize(self):
-        return super().quantize(c.TENTH_PLACE_QUANTIZE)
+        return self.to_decimal().quantize(c.TENTH_PLACE_QUANTIZE)
+
+    def quantize(self, exp, rounding=None):
+        return self.__class__(self.to_decimal().quantize(exp, rounding=rounding))
+
+    def __str__(self):
+        return format(self.to_decimal().normalize(), 'f')
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}('{self.__str__()}')"
+
+    def __hash__(self):
+        return hash(self.to_decimal())
+
+    def __bool__(self):
+        return self._v != 0
+
+    def __float__(self):
+        return self._v / SCALE
+
+    def __int__(self):
+        return int(self.to_decimal())
+
+    def __add__(self, other):
+        v = other._v if isinstance(other, CustomDecimal) else _scaled(other)
+        return _from_scaled(self.__class__, self._v + v)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        v = other._v if isinstance(other, CustomDecimal) else _scaled(other)
+        return _from_scaled(self.__class__, self._v - v)
+
+    def __rsub__(self, other):
+        return _from_scaled(self.__class__, _scaled(other) - self._v)
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return _from_scaled(self.__class__, self._v * other)
+        if isinstance(other, CustomDecimal):
+            return _from_scaled(self.__class__, _div_round(self._v * other._v, SCALE))
+        numerator, denominator = Decimal(other).as_integer_ratio()
+        return _from_scaled(self.__class__, _div_round(self._v * numerator, denominator))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, int):
+            return _from_scaled(self.__class__, _div_round(self._v, other))
+        if isinstance(other, CustomDecimal):
+            # Dollars divided by dollars is a plain ratio
+            return Decimal(self._v) / Decimal(other._v)
+        numerator, denominator = Decimal(other).as_integer_ratio()
+        return _from_scaled(self.__class__, _div_round(self._v * denominator, numerator))
+
+    def __rtruediv__(self, other):
+        return Decimal(other) / self.to_decimal()
+
+    def __floordiv__(self, other):
+        # Floored like int and float, so that a == a // b * b + a % b
+        v, other_v = _operands(self._v, other)
+        return _from_scaled(self.__class__, v // other_v * SCALE)
+
+    def __mod__(self, other):
+        return _from_scaled(self.__class__, self._v % _scaled(other))
+
+    def __pow__(self, other):
+        return self.__class__(self.to_decimal() ** other)
+
+    def __neg__(self):
+        return _from_scaled(self.__class__, -self._v)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return _from_scaled(self.__class__, abs(self._v))
+
+    def __round__(self, n=None):
+        # An int without ndigits, like round() of an int, float or Decimal
+        if n is None:
+            return round(self.to_decimal())
+        return self.__class__(round(self.to_decimal(), n))
+
+    def __eq__(self, other):
+        try:
+            v, other_v = _operands(self._v, other)
+        except (TypeError, ValueError, ArithmeticError):
+            return NotImplemented
+        return v == other_v
+
+    def __lt__(self, other):
+        v, other_v = _operands(self._v, other)
+        return v < other_v
+
+    def __le__(self, other):
+        v, other_v = _operands(self._v, other)
+        return v <= other_v
+
+    def __gt__(self, other):
+        v, other_v = _operands(self._v, other)
+        return v > other_v
+
+    def __ge__(self, other):
+        v, other_v = _operands(self._v, other)
+        return v >= other_v
@@ -2,22 +2,28 @@ import src.constants as c
 from src.decimal.dollar import Dollar
 from src.helpers import compound_interest
 
+_ZERO = Dollar(0)
+
 
 class DollarCompYearly(object):
     def __init__(self, v0, rate):
         self.initial_value = Dollar(v0)
         self.rate = rate
+        # Value compounded for the number of years at each index, filled in lazily as later years are looked up
+        self._years = []
 
     def __getitem__(self, num_months):
         if num_months == 0:
-            return Dollar(0)
-        year = (num_months - 1) // c.MONTHS_PER_YEAR
-        new_value = compound_interest(self.initial_value, self.rate, year, 1)
-        return Dollar(new_value)
+            return _ZERO
+        return self.year((num_months - 1) // c.MONTHS_PER_YEAR)
 
     def year(self, num_years):
-        new_value = compound_interest(self.initial_value, self.rate, num_years, 1)
-        return Dollar(new_value)
+        if num_years < 0:
+            return Dollar(compound_interest(self.initial_value, self.rate, num_years, 1))
+        years = self._years
+        while len(years) <= num_years:
+            years.append(Dollar(compound_interest(self.initial_value, self.rate, len(years), 1)))
+        return years[num_years]
 
     def full_year(self, num_years):
         return self.year(num_years) * c.MONTHS_PER_YEAR
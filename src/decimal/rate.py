@@ -4,6 +4,11 @@ from decimal import Decimal
 from src.decimal.percent import Percent
 
 
+def _rate(value):
+    # Decimal returns NotImplemented for Dollar and Percent operands, which then handle the reflected operation
+    return value if value is NotImplemented else Rate(value)
+
+
 class Rate(Decimal):
     def __new__(cls, *args, percent=None, **kwargs):
         if percent is not None:
@@ -15,46 +20,46 @@ class Rate(Decimal):
         return Percent(self * 100)
 
     def __sub__(self, other):
-        return Rate(super().__sub__(other))
+        return _rate(super().__sub__(other))
 
     def __add__(self, other):
-        return Rate(super().__add__(other))
+        return _rate(super().__add__(other))
 
     def __mul__(self, other):
-        return Rate(super().__mul__(other))
+        return _rate(super().__mul__(other))
 
     def __truediv__(self, other):
-        return Rate(super().__truediv__(other))
+        return _rate(super().__truediv__(other))
 
     def __floordiv__(self, other):
-        return Rate(super().__floordiv__(other))
+        return _rate(super().__floordiv__(other))
 
     def __mod__(self, other):
-        return Rate(super().__mod__(other))
+        return _rate(super().__mod__(other))
 
     def __neg__(self):
-        return Rate(super().__neg__())
+        return _rate(super().__neg__())
 
     def __pos__(self):
-        return Rate(super().__pos__())
+        return _rate(super().__pos__())
 
     def __abs__(self):
-        return Rate(super().__abs__())
+        return _rate(super().__abs__())
 
     def __round__(self, *args, **kwargs):
-        return Rate(super().__round__(*args, **kwargs))
+        return _rate(super().__round__(*args, **kwargs))
 
     def __trunc__(self):
-        return Rate(super().__trunc__())
+        return _rate(super().__trunc__())
 
     def __floor__(self):
-        return Rate(super().__floor__())
+        return _rate(super().__floor__())
 
     def __ceil__(self):
-        return Rate(super().__ceil__())
+        return _rate(super().__ceil__())
 
     def __pow__(self, *args, **kwargs):
-        return Rate(super().__pow__(*args, **kwargs))
+        return _rate(super().__pow__(*args, **kwargs))
 
     def __radd__(self, other):
-        return Rate(super().__radd__(other))
+        return _rate(super().__radd__(other))
@@ -0,0 +1,133 @@
+# Params of the HomeInvestments the tests are written against, in the format of scenario.build_home_investment. The
+# benchmark runs them alongside the yaml scenarios
+FIXTURES = dict(
+    home_investment_condo=dict(
+        scenario_name='home_investment_condo',
+        purchase=dict(
+            price=800 * 1000,
+            down_payment=None,
+            down_payment_percent=20,
+            closing_cost_percent=2
+        ),
+        mortgage=dict(
+            interest_rate_percent=4.75,
+            loan_term_years=30
+        ),
+        taxes=dict(
+            property_tax_percent=1.25,
+            property_tax_annual_increase_percent=2,
+            federal_tax_rate_percent=35,
+            state_tax_rate_percent=11.3,
+            yearly_income=500 * 1000,
+        ),
+        operating_expenses=dict(
+            hoi_percent=0.22,
+            hoi_annual_increase_percent=2,
+            hoa=325,
+            hoa_annual_increase_percent=2,
+            maintenance_percent=0.25,
+            maintenance_annual_increase_percent=2,
+            other_percent=None,
+            other_annual_increase_percent=None
+        ),
+        income=dict(
+            rent=4000,
+            rent_annual_increase_percent=3,
+            tenant_rent=None,
+            tenant_rent_annual_increase_percent=None,
+            vacancy_percent=None,
+            management_fee_percent=None,
+        ),
+        sale=dict(
+            closing_cost_percent=8,
+            annual_appreciation_percent=3,
+        ),
+        index_fund_annual_return_percent=8,
+    ),
+    home_investment_low_interest_house=dict(
+        scenario_name='home_investment_low_interest_house',
+        purchase=dict(
+            price=900 * 1000,
+            down_payment=None,
+            down_payment_percent=20,
+            closing_cost_percent=2
+        ),
+        mortgage=dict(
+            interest_rate_percent=3.25,
+            loan_term_years=30
+        ),
+        taxes=dict(
+            property_tax_percent=1.25,
+            property_tax_annual_increase_percent=2,
+            federal_tax_rate_percent=35,
+            state_tax_rate_percent=11.3,
+            yearly_income=500 * 1000,
+        ),
+        operating_expenses=dict(
+            hoi_percent=0.22,
+            hoi_annual_increase_percent=2,
+            hoa=None,
+            hoa_annual_increase_percent=None,
+            maintenance_percent=1,
+            maintenance_annual_increase_percent=2,
+            other_percent=None,
+            other_annual_increase_percent=None
+        ),
+        income=dict(
+            rent=1650,
+            rent_annual_increase_percent=3,
+            tenant_rent=1600,
+            tenant_rent_annual_increase_percent=None,
+            vacancy_percent=None,
+            management_fee_percent=None,
+        ),
+        sale=dict(
+            closing_cost_percent=8,
+            annual_appreciation_percent=5,
+        ),
+        index_fund_annual_return_percent=10,
+    ),
+    home_investment_low_interest_house_fully_rented=dict(
+        scenario_name='home_investment_low_interest_house_fully_rented',
+        purchase=dict(
+            price=850 * 1000,
+            down_payment=None,
+            down_payment_percent=20,
+            closing_cost_percent=2
+        ),
+        mortgage=dict(
+            interest_rate_percent=3.25,
+            loan_term_years=30
+        ),
+        taxes=dict(
+            property_tax_percent=1.25,
+            property_tax_annual_increase_percent=2,
+            federal_tax_rate_percent=35,
+            state_tax_rate_percent=11.3,
+            yearly_income=500 * 1000,
+        ),
+        operating_expenses=dict(
+            hoi_percent=0.22,
+            hoi_annual_increase_percent=2,
+            hoa=None,
+            hoa_annual_increase_percent=None,
+            maintenance_percent=1,
+            maintenance_annual_increase_percent=2,
+            other_percent=None,
+            other_annual_increase_percent=None
+        ),
+        income=dict(
+            rent=None,
+            rent_annual_increase_percent=None,
+            tenant_rent=4500,
+            tenant_rent_annual_increase_percent=3,
+            vacancy_percent=5,
+            management_fee_percent=8,
+        ),
+        sale=dict(
+            closing_cost_percent=8,
+            annual_appreciation_percent=5,
+        ),
+        index_fund_annual_return_percent=9,
+    ),
+)
@@ -0,0 +1,155 @@
+import argparse
+import os
+import sys
+from typing import Callable, NamedTuple
+
+import src.constants as c
+from src.homeinvestment import HomeInvestment
+from src.scenario import build_home_investment, params_from_yaml, with_params
+
+Metric = Callable[[HomeInvestment], float]
+
+
+class GoalSeekResult(NamedTuple):
+    # The input closest to the target on the side where the metric is >= target, e.g. the maximum affordable price
+    value: float
+    metric: float
+    # The other end of the final bracket, on the side where the metric is < target
+    other_value: float
+    evaluations: int
+    converged: bool
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description='Solve for the input at which a metric reaches a target')
+    parser.add_argument(
+        '-i', '--input',
+        help='Path to a scenario yaml file',
+        required=True,
+        type=os.path.abspath
+    )
+    parser.add_argument(
+        '-p', '--param',
+        help='Dotted path of the param to solve for, e.g. purchase.price or income.tenant_rent',
+        required=True
+    )
+    parser.add_argument(
+        '-m', '--metric',
+        help='Column of the monthly breakdown the target applies to',
+        default='score'
+    )
+    parser.add_argument(
+        '-y', '--year',
+        help='Year the metric is read at, defaults to the minimum over every month after the purchase',
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        '-t', '--target',
+        type=float,
+        default=0.
+    )
+    parser.add_argument('--low', type=float, required=True)
+    parser.add_argument('--high', type=float, required=True)
+    parser.add_argument(
+        '--tolerance',
+        help='Width of the final bracket in units of the param',
+        type=float,
+        default=.01
+    )
+    return parser.parse_args(sys.argv[1:])
+
+
+def _column(home_investment: HomeInvestment, column):
+    if home_investment.breakdown.engine == 'vectorized':
+        return home_investment.breakdown.monthly.arrays([column])[column]
+    return [float(value) for value in home_investment.breakdown.monthly.list().column(column)]
+
+
+def at_year(column, year) -> Metric:
+    # Value of a monthly breakdown column at the end of a year, e.g. at_year('score', 10)
+    return lambda home_investment: float(_column(home_investment, column)[year * c.MONTHS_PER_YEAR])
+
+
+def minimum(column, start_month=1) -> Metric:
+    # Lowest value of a monthly breakdown column, e.g. minimum('monthly_cashflow') >= 0 for a never negative cashflow
+    return lambda home_investment: float(min(_column(home_investment, column)[start_month:]))
+
+
+def goal_seek(
+        params,
+        path,
+        metric: Metric,
+        low,
+        high,
+        target=0.,
+        tolerance=.01,
+        metric_tolerance=0.,
+        max_evaluations=100,
+        engine='vectorized',
+) -> GoalSeekResult:
+    # Illinois false position: secant steps inside a bracket whose ends keep opposite signs, so it converges in tens of
+    # evaluations where bisection alone would take ~log2((high - low) / tolerance)
+    evaluated = {}
+
+    def f(value):
+        if value not in evaluated:
+            home_investment = build_home_investment(with_params(params, {path: value}), breakdown_engine=engine)
+            evaluated[value] = metric(home_investment) - target
+        return evaluated[value]
+
+    f_low, f_high = f(low), f(high)
+    assert (f_low >= 0) != (f_high >= 0), (
+        f'{path} between {low} and {high} does not bracket the target, the metric is {f_low + target} and '
+        f'{f_high + target}'
+    )
+
+    side = 0
+    while abs(high - low) > tolerance and len(evaluated) < max_evaluations:
+        value = (low * f_high - high * f_low) / (f_high - f_low)
+        if not min(low, high) < value < max(low, high):
+            value = (low + high) / 2
+        f_value = f(value)
+        if abs(f_value) <= metric_tolerance:
+            low = high = value
+            f_low = f_high = f_value
+            break
+
+        if (f_value >= 0) == (f_low >= 0):
+            low, f_low = value, f_value
+            # The high end was kept twice in a row, halving its weight stops false position from stalling on it
+            if side == -1:
+                f_high /= 2
+            side = -1
+        else:
+            high, f_high = value, f_value
+            if side == 1:
+                f_low /= 2
+            side = 1
+
+    # f_low and f_high may have been halved, only their signs are used from here on
+    value, other_value = (low, high) if f_low >= 0 else (high, low)
+    return GoalSeekResult(
+        value=value,
+        metric=evaluated[value] + target,
+        other_value=other_value,
+        evaluations=len(evaluated),
+        converged=abs(high - low) <= tolerance or abs(evaluated[value]) <= metric_tolerance,
+    )
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    result = goal_seek(
+        params_from_yaml(args.input),
+        args.param,
+        at_year(args.metric, args.year) if args.year is not None else minimum(args.metric),
+        low=args.low,
+        high=args.high,
+        target=args.target,
+        tolerance=args.tolerance,
+    )
+    print(
+        f'{args.param} = {result.value:.2f} gives {args.metric} {result.metric:.4f} '
+        f'after {result.evaluations} evaluations{"" if result.converged else ", did not converge"}'
+    )
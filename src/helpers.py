@@ -1,12 +1,10 @@
-import inspect
 import operator
 import os
 import shutil
+import sys
 from decimal import Decimal
 from functools import reduce
 
-import yaml
-
 
 def range_is_last(start, end):
     for i in range(start, end):
@@ -37,6 +35,15 @@ def compound_yearly(principle, rate, years):
     return compound_interest(principle, rate, years, 1)
 
 
+def growth_series(growth, months):
+    # growth ** k and the sum of growth ** i for i < k, for k up to months of compounding with a deposit every month
+    powers, sums = [Decimal(1)], [Decimal(0)]
+    for _ in range(months):
+        sums.append(sums[-1] + powers[-1])
+        powers.append(powers[-1] * growth)
+    return powers, sums
+
+
 def sub(iterable):
     return reduce(operator.__sub__, iterable)
 
@@ -55,11 +62,15 @@ def folder_del_contents(path):
 
 
 def rel(*path):
-    caller_filepath = inspect.stack()[1].filename
+    caller_filepath = sys._getframe(1).f_code.co_filename
     caller_dirname = os.path.dirname(caller_filepath)
     return os.path.realpath(os.path.join(caller_dirname, *path))
 
 
 def yaml_safe_load(path):
+    import yaml
+
+    # The libyaml loader is several times faster when PyYAML was built with it
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
     with open(path) as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=loader)
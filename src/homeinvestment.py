@@ -1,15 +1,30 @@
-import pandas as pd
-from tabulate import tabulate
+import functools
+from decimal import Decimal
 
-from src.breakdown.investmentbreakdown import InvestmentBreakdown
+import src.constants as c
+from src.breakdown.investmentbreakdown import BreakdownEngine, InvestmentBreakdown
 from src.decimal.rate import Rate
+from src.helpers import compound_interest, rel
 from src.income import IncomeFactoryType
 from src.mortgage import MortgageFactoryType
 from src.operatingexpenses import OperatingExpensesFactoryType
+from src.profiling import timed
 from src.purchase import PurchaseFactoryType
+from src.resultcache import ResultCache
 from src.sale import SaleFactoryType
 from src.taxes import TaxesFactoryType
 
+# Components built from each input, given the components each one is built from, e.g. taxes need the mortgage
+COMPONENT_DEPENDENCIES = dict(
+    purchase=[],
+    mortgage=['purchase'],
+    taxes=['mortgage', 'purchase'],
+    income=['taxes'],
+    operating_expenses=['purchase', 'income', 'taxes'],
+    sale=['purchase'],
+    index_fund_monthly_growth=[],
+)
+
 
 class HomeInvestment(object):
     def __init__(
@@ -24,19 +39,88 @@ class HomeInvestment(object):
 
             # Index fund
             index_fund_annual_return_percent,
+
+            breakdown_engine: BreakdownEngine = 'decimal',
+            output_dir=None,
+            # A ResultCache the breakdowns are read from and written to under cache_key, see scenario_hash
+            cache: ResultCache = None,
+            cache_key=None,
     ):
+        assert cache is None or cache_key, 'A cache needs a cache_key'
         self.scenario_name = scenario_name
-        self.purchase = purchase()
-        self.mortgage = mortgage(self.purchase)
-        self.taxes = taxes(self.mortgage, self.purchase)
-        self.income = income(self.taxes)
-        self.operating_expenses = operating_expenses(self.purchase, self.income, self.taxes)
-        self.sale = sale(self.purchase)
+        self.output_dir = output_dir or rel('../output', scenario_name)
+        self.cache = cache
+        self.cache_key = cache_key
+        # Components are built on first access, each one pulling in the components it depends on
+        self._purchase_factory = purchase
+        self._mortgage_factory = mortgage
+        self._taxes_factory = taxes
+        self._income_factory = income
+        self._operating_expenses_factory = operating_expenses
+        self._sale_factory = sale
         self.index_fund_annual_return_rate = Rate(percent=index_fund_annual_return_percent or 10)
-        self.breakdown = InvestmentBreakdown(self)
-        self._describe_tables = _create_describe_tables(self)
+        self.breakdown = InvestmentBreakdown(self, engine=breakdown_engine)
+
+    @functools.cached_property
+    def purchase(self):
+        with timed('factory.purchase'):
+            return self._purchase_factory()
+
+    @functools.cached_property
+    def mortgage(self):
+        purchase = self.purchase
+        with timed('factory.mortgage'):
+            return self._mortgage_factory(purchase)
+
+    @functools.cached_property
+    def taxes(self):
+        mortgage, purchase = self.mortgage, self.purchase
+        with timed('factory.taxes'):
+            return self._taxes_factory(mortgage, purchase)
+
+    @functools.cached_property
+    def income(self):
+        taxes = self.taxes
+        with timed('factory.income'):
+            return self._income_factory(taxes)
+
+    @functools.cached_property
+    def operating_expenses(self):
+        purchase, income, taxes = self.purchase, self.income, self.taxes
+        with timed('factory.operating_expenses'):
+            return self._operating_expenses_factory(purchase, income, taxes)
+
+    @functools.cached_property
+    def sale(self):
+        purchase = self.purchase
+        with timed('factory.sale'):
+            return self._sale_factory(purchase)
+
+    @functools.cached_property
+    def index_fund_monthly_growth(self):
+        return compound_interest(
+            principle=Decimal(1),
+            rate=self.index_fund_annual_return_rate,
+            years=Decimal(1 / c.MONTHS_PER_YEAR),
+            number=Decimal(c.MONTHS_PER_YEAR)
+        )
+
+    def reuse_components(self, other, names):
+        # Shares the components other has already built, which the caller knows were built from the same inputs
+        for name in names:
+            assert name in COMPONENT_DEPENDENCIES, f'Unknown component {name}'
+            if name in other.__dict__:
+                self.__dict__[name] = other.__dict__[name]
+
+    @functools.cached_property
+    def _describe_tables(self):
+        with timed('describe_tables'):
+            return _create_describe_tables(self)
 
     def describe(self):
+        import pandas as pd
+        from tabulate import tabulate
+
         def tabulate_describe(description):
             print(f'\n{description["header"]}')
             df = pd.DataFrame(description['table'])
@@ -1,12 +1,20 @@
+import functools
 from typing import Union, Callable
 
 import src.constants as c
 from src.decimal.dollar import Dollar
 from src.decimal.dollarcompounding import DollarCompYearly
 from src.decimal.rate import Rate
+from src.profiling import stage
 from src.taxes import Taxes
 
 
+def tax_savings(tax_deduction, tax_rate, standard_deduction, dollar=Dollar, maximum=max):
+    # What itemizing a year's deduction saves over the standard deduction, of Dollars or, with np.asarray and
+    # np.maximum, of float arrays of scenarios
+    return maximum(dollar(tax_rate * tax_deduction) - dollar(tax_rate * standard_deduction), dollar(0))
+
+
 class Income(object):
     def __init__(
             self,
@@ -24,23 +32,30 @@ class Income(object):
         self.tenant_rent = DollarCompYearly(v0=tenant_rent, rate=self.tenant_rent_annual_increase_rate)
         self.vacancy_rate = vacancy_rate
         self.management_fee_rate = management_fee_rate
-        self.tax_savings_per_month, self.tax_savings_per_year = self._calculate_tax_savings(taxes)
+        self._taxes = taxes
+
+    @functools.cached_property
+    def _tax_savings(self):
+        return self._calculate_tax_savings(self._taxes)
+
+    @property
+    def tax_savings_per_month(self):
+        return self._tax_savings[0]
+
+    @property
+    def tax_savings_per_year(self):
+        return self._tax_savings[1]
 
     @staticmethod
+    @stage('income.tax_savings')
     def _calculate_tax_savings(taxes: Taxes):
         tax_savings_per_year = [Dollar(0)]
         tax_savings_per_month = [Dollar(0)]
         for year, tax_deduction in enumerate(taxes.tax_deduction_per_year):
             if year == 0:
                 continue
-            federal_itemized_savings = Dollar(taxes.federal_tax_rate * tax_deduction)
-            federal_standard_deduction_savings = Dollar(taxes.federal_tax_rate * taxes.federal_standard_deduction)
-            federal_savings = max(federal_itemized_savings - federal_standard_deduction_savings, Dollar(0))
-
-            state_itemized_savings = Dollar(taxes.state_tax_rate * tax_deduction)
-            state_standard_deduction_savings = Dollar(taxes.state_tax_rate * taxes.state_standard_deduction)
-            state_savings = max(state_itemized_savings - state_standard_deduction_savings, Dollar(0))
-
+            federal_savings = tax_savings(tax_deduction, taxes.federal_tax_rate, taxes.federal_standard_deduction)
+            state_savings = tax_savings(tax_deduction, taxes.state_tax_rate, taxes.state_standard_deduction)
             total_savings = federal_savings + state_savings
             tax_savings_per_year.append(total_savings)
             for i in range(c.MONTHS_PER_YEAR):
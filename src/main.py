@@ -1,58 +1,174 @@
 import argparse
+import concurrent.futures
+import contextlib
+import glob
+import hashlib
+import io
+import json
 import os
+import re
+import shutil
 import sys
 
+from src.helpers import folder_del_contents, rel
+from src.resultcache import ResultCache
+from src.scenario import build_home_investment, params_from_yaml, scenario_hash
+
+OUTPUT_DIR = rel('../output')
+# Written last, so a scenario that failed or was interrupted halfway is rebuilt on the next run
+COMPLETE_FILENAME = '.complete'
+# Written first, the input path an output directory was built from
+SOURCE_FILENAME = '.source'
+HASH_DIGITS = 12
+
 
 def _parse_args():
     # Creates and returns the ArgumentParser object
     parser = argparse.ArgumentParser(description='Calculate profitability of purchasing a house')
     parser.add_argument(
         '-i', '--input',
-        help='Path to a yaml file describing the input parameters, such as house price and interest_rate rate',
+        help='Paths, directories or globs of yaml files describing the input parameters, such as house price and '
+             'interest_rate rate',
         required=True,
-        type=os.path.abspath
+        nargs='+'
     )
     parser.add_argument(
         '-d', '--delete-output',
         help='Delete everything in the output directory',
         action='store_true'
     )
+    parser.add_argument(
+        '-p', '--processes',
+        help='Number of worker processes, defaults to the number of cores',
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        '-e', '--engine',
+        help='Breakdown engine used to evaluate the scenarios',
+        choices=['decimal', 'vectorized', 'yearly'],
+        default='decimal'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        help='Directory of the breakdown cache shared by runs, defaults to $HOUSING_CACHE_DIR or '
+             '~/.cache/housing-profit-calculator',
+        default=None
+    )
+    parser.add_argument(
+        '--no-cache',
+        help='Evaluate every scenario without reading or writing the breakdown cache',
+        action='store_true'
+    )
     return parser.parse_args(sys.argv[1:])
 
 
-# def _load_house_params(house_params_path):
-#     assert os.path.exists(house_params_path), 'Input path does not exist'
-#
-#     house_params = yaml.safe_load(open(house_params_path))
-#     return HomeInvestment(
-#         interest_rate=house_params['interest_rate'],
-#         down_payment=house_params.get('down_payment'),
-#         down_payment_percent=house_params.get('down_payment_percent'),
-#         loan_term_years=house_params['loan_term_years'],
-#         federal_tax_rate=house_params['federal_tax_rate'],
-#         state_tax_rate=house_params['state_tax_rate'],
-#         property_tax_rate=house_params['property_tax_rate'],
-#         hoi_rate=house_params['hoi_rate'],
-#         purchase_price=house_params['price'],
-#         yearly_income=house_params['yearly_income'],
-#         rent=house_params.get('rent'),
-#         rent_annual_increase_rate=house_params.get('rent_annual_increase_rate'),
-#         vacancy_percent=house_params.get('vacancy_percent'),
-#         tenant_rent=house_params.get('tenant_rent'),
-#         tenant_rent_control_percent=house_params.get('tenant_rent_control_percent'),
-#         hoa=house_params.get('hoa'),
-#         purchase_closing_cost_percent=house_params['purchase_closing_cost_percent'],
-#         closing_cost_percent=house_params.get('closing_cost_percent'),
-#         annual_appreciation_percent=house_params.get('annual_appreciation_percent'),
-#         index_fund_annual_return_percent=house_params.get('index_fund_annual_return_percent'),
-#         scenario_name=pathlib.Path(house_params_path).stem,
-#         maintenance_rate=house_params.get('maintenance_rate'),
-#     )
-
-
-def main(home_investment, delete_output):
-    pass
+def scenario_paths(inputs):
+    paths = []
+    for path in inputs:
+        if glob.has_magic(path):
+            matches = sorted(glob.glob(path))
+        elif os.path.isdir(path):
+            matches = sorted(glob.glob(os.path.join(path, '*.yaml')) + glob.glob(os.path.join(path, '*.yml')))
+        else:
+            assert os.path.exists(path), f'Input path {path} does not exist'
+            matches = [path]
+        paths += [os.path.abspath(match) for match in matches if os.path.abspath(match) not in paths]
+    return paths
+
+
+def scenario_output_dir(params, output_dir=OUTPUT_DIR, engine='decimal', source=None):
+    # Inputs with the same name, e.g. a/x.yaml and b/x.yaml, get their own directories, and so does every engine
+    key = json.dumps([scenario_hash(params), engine, source and os.path.abspath(source)])
+    digest = hashlib.sha256(key.encode()).hexdigest()[:HASH_DIGITS]
+    return os.path.join(output_dir, f'{params["scenario_name"]}-{digest}')
+
+
+def is_complete(scenario_dir):
+    return os.path.exists(os.path.join(scenario_dir, COMPLETE_FILENAME))
+
+
+def _source(scenario_dir):
+    try:
+        with open(os.path.join(scenario_dir, SOURCE_FILENAME)) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _remove_stale(scenario_dir, source):
+    # Outputs of earlier versions of the same input, which differ only in their hash. Outputs of other inputs with the
+    # same name are left alone
+    parent, name = os.path.split(scenario_dir)
+    scenario_name = name[:-HASH_DIGITS - 1]
+    pattern = re.compile(rf'{re.escape(scenario_name)}-[0-9a-f]{{{HASH_DIGITS}}}')
+    for other in os.listdir(parent):
+        path = os.path.join(parent, other)
+        if other != name and pattern.fullmatch(other) and _source(path) == source:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def run_scenario(params, scenario_dir, engine='decimal', cache_dir=None, use_cache=True, source=None):
+    if os.path.isdir(scenario_dir):
+        shutil.rmtree(scenario_dir)
+    source = source and os.path.abspath(source)
+    os.makedirs(scenario_dir)
+    with open(os.path.join(scenario_dir, SOURCE_FILENAME), 'w') as f:
+        f.write(source or '')
+    cache = ResultCache(cache_dir) if use_cache else None
+    home_investment = build_home_investment(params, breakdown_engine=engine, output_dir=scenario_dir, cache=cache)
+    with contextlib.redirect_stdout(io.StringIO()):
+        home_investment.breakdown.monthly.export(rows=home_investment.breakdown.monthly.list())
+        home_investment.breakdown.yearly.export(rows=home_investment.breakdown.yearly.list())
+    open(os.path.join(scenario_dir, COMPLETE_FILENAME), 'w').close()
+    _remove_stale(scenario_dir, source or '')
+    return scenario_dir
+
+
+def main(
+        inputs,
+        delete_output,
+        processes=None,
+        engine='decimal',
+        output_dir=OUTPUT_DIR,
+        cache_dir=None,
+        use_cache=True,
+):
+    os.makedirs(output_dir, exist_ok=True)
+    if delete_output:
+        folder_del_contents(output_dir)
+
+    # Hashing is cheap next to evaluating a scenario, so only the scenarios whose hash has no complete output run
+    pending = {}
+    for path in scenario_paths(inputs):
+        params = params_from_yaml(path)
+        scenario_dir = scenario_output_dir(params, output_dir, engine, path)
+        if is_complete(scenario_dir):
+            print(f'Skipping unchanged {path}, see {scenario_dir}')
+        else:
+            pending[path] = (params, scenario_dir)
+
+    if not pending:
+        return []
+
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        futures = {
+            executor.submit(run_scenario, params, scenario_dir, engine, cache_dir, use_cache, path): path
+            for path, (params, scenario_dir) in pending.items()
+        }
+        for future in concurrent.futures.as_completed(futures):
+            print(f'Outputting {futures[future]} to {future.result()}')
+
+    return [scenario_dir for _, scenario_dir in pending.values()]
 
 
 if __name__ == '__main__':
     args = _parse_args()
+    main(
+        args.input,
+        args.delete_output,
+        args.processes,
+        args.engine,
+        cache_dir=args.cache_dir,
+        use_cache=not args.no_cache,
+    )
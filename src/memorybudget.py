@@ -0,0 +1,109 @@
+import collections
+import functools
+import os
+import sys
+import threading
+import weakref
+
+# Megabytes of cached breakdowns a process keeps across every HomeInvestment, the least recently used are dropped beyond
+MEMORY_BUDGET_ENV = 'HOUSING_MEMORY_BUDGET_MB'
+DEFAULT_MEMORY_BUDGET_MB = 256
+_ATTRIBUTE = '_budgeted'
+
+
+def nbytes(value):
+    # Approximate size of a cached value, numpy arrays and timelines report their buffers
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(nbytes(v) for v in value)
+    return getattr(value, 'nbytes', None) or sys.getsizeof(value)
+
+
+class MemoryBudget(object):
+    # Values are stored on the instance they were computed for, so they are freed with it, while the budget only keeps
+    # a weak reference to the instance to evict its values when the cached total exceeds max_bytes
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # (id(owner), name) to (weak reference to owner, bytes), least recently used first
+        self._entries = collections.OrderedDict()
+        # Reentrant, a garbage collection inside a locked block can call _forget on the same thread
+        self._lock = threading.RLock()
+
+    def get(self, owner, name, compute, size=nbytes):
+        key = (id(owner), name)
+        store = owner.__dict__.get(_ATTRIBUTE, {})
+        with self._lock:
+            if name in store:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return store[name]
+            self.misses += 1
+
+        value = compute()
+        self.put(owner, name, value, size(value))
+        return value
+
+    def peek(self, owner, name):
+        # The cached value or None, without counting a hit or a miss
+        return owner.__dict__.get(_ATTRIBUTE, {}).get(name)
+
+    def put(self, owner, name, value, size):
+        key = (id(owner), name)
+        with self._lock:
+            self._remove(key)
+            owner.__dict__.setdefault(_ATTRIBUTE, {})[name] = value
+            self._entries[key] = (weakref.ref(owner, lambda _: self._forget(key)), size)
+            self.bytes += size
+            while self.bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, owner, name=None):
+        with self._lock:
+            names = list(owner.__dict__.get(_ATTRIBUTE, {})) if name is None else [name]
+            for n in names:
+                self._remove((id(owner), n))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        ref, size = entry
+        self.bytes -= size
+        owner = ref()
+        if owner is not None:
+            owner.__dict__.get(_ATTRIBUTE, {}).pop(key[1], None)
+
+    def _forget(self, key):
+        # The owner was garbage collected along with its values
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+
+    def stats(self):
+        return dict(
+            max_bytes=self.max_bytes,
+            bytes=self.bytes,
+            entries=len(self._entries),
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+        )
+
+
+BUDGET = MemoryBudget(int(float(os.environ.get(MEMORY_BUDGET_ENV, DEFAULT_MEMORY_BUDGET_MB)) * 1024 * 1024))
+
+
+def budgeted(f):
+    # Caches the result of a method without arguments on its instance, under the process wide BUDGET
+    @functools.wraps(f)
+    def wrapper(self):
+        return BUDGET.get(self, f.__name__, lambda: f(self))
+
+    return wrapper
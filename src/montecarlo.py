@@ -0,0 +1,280 @@
+import argparse
+import concurrent.futures
+import csv
+import math
+import os
+import sys
+from typing import Literal, NamedTuple, Union
+
+import numpy as np
+
+import src.constants as c
+from src.breakdown.vectorizedengine import compound_cumsum, monthly_arrays
+from src.helpers import yaml_safe_load
+from src.homeinvestment import HomeInvestment
+from src.scenario import build_home_investment, params_from_yaml
+
+# Yearly rates drawn per path, in the order of the rows and columns of the correlation matrix
+RATES = ['appreciation', 'rent_increase', 'tenant_rent_increase', 'index_fund_return']
+BAND_COLUMNS = ['home_investment_value', 'index_fund_value', 'score']
+PERCENTILES = (5, 25, 50, 75, 95)
+# Paths evaluated per (paths x months) block, each block has its own seed so results do not depend on processes
+CHUNK_PATHS = 10000
+
+DistributionKind = Literal['normal', 'lognormal']
+
+
+class Distribution(NamedTuple):
+    stdev_percent: float
+    # Defaults to the rate of the scenario
+    mean_percent: Union[float, None] = None
+    # lognormal draws 1 + rate from a lognormal with the given mean and stdev, so a year never loses more than 100%
+    kind: DistributionKind = 'normal'
+
+
+DEFAULT_DISTRIBUTIONS = dict(
+    appreciation=Distribution(stdev_percent=5),
+    rent_increase=Distribution(stdev_percent=2),
+    tenant_rent_increase=Distribution(stdev_percent=2),
+    index_fund_return=Distribution(stdev_percent=15, kind='lognormal'),
+)
+DEFAULT_CORRELATION = [
+    [1., .5, .5, .2],
+    [.5, 1., .8, .1],
+    [.5, .8, 1., .1],
+    [.2, .1, .1, 1.],
+]
+
+
+class MonteCarloResult(NamedTuple):
+    paths: int
+    years: np.ndarray
+    percentiles: tuple
+    # Column name to a (percentiles x years) array
+    bands: dict[str, np.ndarray]
+
+    def dicts(self):
+        return [
+            dict(year=int(year)) | {
+                f'{column}_p{p:g}': float(self.bands[column][i, y])
+                for column in BAND_COLUMNS for i, p in enumerate(self.percentiles)
+            }
+            for y, year in enumerate(self.years)
+        ]
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description='Simulate stochastic appreciation, rent and tenant rent growth and index fund returns'
+    )
+    parser.add_argument(
+        '-i', '--input',
+        help='Path to a scenario yaml file',
+        required=True,
+        type=os.path.abspath
+    )
+    parser.add_argument(
+        '-o', '--output',
+        help='Path of the csv of percentile bands per year to write',
+        required=True,
+        type=os.path.abspath
+    )
+    parser.add_argument(
+        '-c', '--config',
+        help='Path to a yaml file with distributions of the rates and their correlation, see DEFAULT_DISTRIBUTIONS',
+        type=os.path.abspath,
+        default=None
+    )
+    parser.add_argument(
+        '-n', '--paths',
+        help='Number of simulated paths',
+        type=int,
+        default=10000
+    )
+    parser.add_argument(
+        '-s', '--seed',
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        '-p', '--processes',
+        help='Number of worker processes the chunks of paths are sharded over',
+        type=int,
+        default=1
+    )
+    return parser.parse_args(sys.argv[1:])
+
+
+def _deterministic_rates(home_investment: HomeInvestment):
+    return dict(
+        appreciation=float(home_investment.sale.annual_appreciation_rate),
+        rent_increase=float(home_investment.income.rent_annual_increase_rate),
+        tenant_rent_increase=float(home_investment.income.tenant_rent_annual_increase_rate),
+        index_fund_return=float(home_investment.index_fund_annual_return_rate),
+    )
+
+
+def _draw_rates(distributions, means, cholesky, paths, years, seed):
+    # Correlated standard normals mapped onto each rate's distribution, returns rate name to a (paths x years) array
+    rng = np.random.default_rng(seed)
+    z = cholesky @ rng.standard_normal((len(RATES), paths * years))
+    rates = {}
+    for i, name in enumerate(RATES):
+        distribution, mean = distributions[name], means[name]
+        stdev = distribution.stdev_percent / 100
+        if distribution.kind == 'lognormal':
+            sigma = math.sqrt(math.log1p((stdev / (1 + mean)) ** 2))
+            mu = math.log1p(mean) - sigma ** 2 / 2
+            drawn = np.expm1(mu + sigma * z[i])
+        else:
+            drawn = np.maximum(mean + stdev * z[i], -1.)
+        rates[name] = drawn.reshape(paths, years)
+    return rates
+
+
+def _rent(initial_value, increases, year):
+    # (paths x months) rent, where year y compounds the increases of years 1 to y - 1 and the closing month has none
+    growth = np.cumprod(1. + increases, axis=1)
+    factor = np.concatenate((np.ones((len(increases), 1)), growth[:, :-1]), axis=1)
+    rent = initial_value * factor[:, np.maximum(year - 1, 0)]
+    rent[:, 0] = 0.
+    return rent
+
+
+def _simulate_chunk(args):
+    base, distributions, means, cholesky, paths, seed = args
+    month, year = base['month'], base['year']
+    years = int(year[-1])
+    rates = _draw_rates(distributions, means, cholesky, paths, years, seed)
+    ends = np.arange(0, years + 1) * c.MONTHS_PER_YEAR
+
+    rent = _rent(base['rent_initial'], rates['rent_increase'], year)
+    tenant_rent = _rent(base['tenant_rent_initial'], rates['tenant_rent_increase'], year)
+    # Vacancy and the management fee are operating costs of the tenant rent
+    vacancy = base['vacancy_rate'] * tenant_rent
+    tenant_costs = vacancy + base['management_fee_rate'] * (tenant_rent - vacancy)
+    cashflow = base['cashflow_without_rent'] + rent + tenant_rent - tenant_costs
+    net_operating_cost = base['net_operating_cost_without_tenant'][ends] + np.cumsum(tenant_costs, axis=1)[:, ends]
+
+    index_fund_growth = 1. + rates['index_fund_return'][:, np.maximum(year - 1, 0)] / c.MONTHS_PER_YEAR
+    index_fund_growth[:, month == 0] = 1.
+    # Surplus and index fund deposits compound together, sharing the cumulative growth
+    deposits = np.stack((np.maximum(cashflow, 0.), np.maximum(-cashflow, 0.)))
+    surplus_value, index_fund_value = compound_cumsum(deposits, index_fund_growth)[:, :, ends]
+
+    # Only the year end values are kept, where the appreciated price is the price compounded by each year's rate
+    price = base['price']
+    appreciated_price = price * np.concatenate(
+        (np.ones((paths, 1)), np.cumprod(1. + rates['appreciation'], axis=1)), axis=1
+    )
+    cash_to_receive = (
+            appreciated_price - price
+            + base['principle_paid'][ends]
+            + base['down_payment']
+            - appreciated_price * base['sale_closing_cost_rate']
+    )
+    home_investment_value = (
+            cash_to_receive
+            + surplus_value
+            - net_operating_cost
+            - base['interest_paid'][ends]
+    )
+    return dict(
+        home_investment_value=home_investment_value,
+        index_fund_value=index_fund_value,
+        score=home_investment_value / index_fund_value * 100 - 100,
+    )
+
+
+def simulate(
+        home_investment: HomeInvestment,
+        paths=10000,
+        distributions: dict[str, Distribution] = None,
+        correlation=None,
+        seed=None,
+        percentiles=PERCENTILES,
+        processes=1,
+        chunk_paths=CHUNK_PATHS,
+) -> MonteCarloResult:
+    distributions = DEFAULT_DISTRIBUTIONS | (distributions or {})
+    assert set(distributions) == set(RATES), f'Distributions must be given for {RATES}'
+    correlation = np.array(DEFAULT_CORRELATION if correlation is None else correlation, dtype=float)
+    assert correlation.shape == (len(RATES), len(RATES)), f'Correlation must be a {len(RATES)}x{len(RATES)} matrix'
+    assert np.allclose(correlation, correlation.T) and np.allclose(np.diag(correlation), 1.), 'Invalid correlation'
+    cholesky = np.linalg.cholesky(correlation)
+
+    deterministic = _deterministic_rates(home_investment)
+    means = {
+        name: deterministic[name] if d.mean_percent is None else d.mean_percent / 100
+        for name, d in distributions.items()
+    }
+
+    # Everything that does not depend on the drawn rates is computed once, by the vectorized engine
+    cols = monthly_arrays(home_investment, [
+        'month', 'year', 'monthly_cashflow', 'monthly_rent', 'monthly_tenant_rent', 'monthly_vacancy',
+        'monthly_management_fee', 'principle_paid', 'net_operating_cost', 'interest_paid',
+    ])
+    purchase, sale, income = home_investment.purchase, home_investment.sale, home_investment.income
+    tenant_costs = cols['monthly_vacancy'] + cols['monthly_management_fee']
+    rents = cols['monthly_rent'] + cols['monthly_tenant_rent'] - tenant_costs
+    base = dict(
+        month=cols['month'],
+        year=cols['year'],
+        rent_initial=float(income.rent.initial_value),
+        tenant_rent_initial=float(income.tenant_rent.initial_value),
+        vacancy_rate=float(income.vacancy_rate),
+        management_fee_rate=float(income.management_fee_rate),
+        cashflow_without_rent=cols['monthly_cashflow'] - rents,
+        principle_paid=cols['principle_paid'],
+        net_operating_cost_without_tenant=cols['net_operating_cost'] - np.cumsum(tenant_costs),
+        interest_paid=cols['interest_paid'],
+        price=float(purchase.price),
+        down_payment=float(purchase.down_payment),
+        sale_closing_cost_rate=float(sale.closing_cost_rate),
+    )
+
+    sizes = [min(chunk_paths, paths - start) for start in range(0, paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(base, distributions, means, cholesky, size, s) for size, s in zip(sizes, seeds)]
+    if processes > 1 and len(tasks) > 1:
+        with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+            chunks = list(executor.map(_simulate_chunk, tasks))
+    else:
+        chunks = list(map(_simulate_chunk, tasks))
+
+    bands = {
+        column: np.percentile(np.concatenate([chunk[column] for chunk in chunks]), percentiles, axis=0)
+        for column in BAND_COLUMNS
+    }
+    return MonteCarloResult(
+        paths=paths,
+        years=np.arange(bands['score'].shape[1]),
+        percentiles=tuple(percentiles),
+        bands=bands,
+    )
+
+
+def _load_config(path):
+    config = yaml_safe_load(path) if path else {}
+    distributions = {name: Distribution(**d) for name, d in config.get('distributions', {}).items()}
+    return distributions, config.get('correlation')
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    config_distributions, config_correlation = _load_config(args.config)
+    result = simulate(
+        build_home_investment(params_from_yaml(args.input)),
+        paths=args.paths,
+        distributions=config_distributions,
+        correlation=config_correlation,
+        seed=args.seed,
+        processes=args.processes,
+    )
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', newline='') as f:
+        rows = result.dicts()
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f'Outputting {result.paths} paths to {args.output}\n')
@@ -1,5 +1,7 @@
 from __future__ import print_function
 
+import functools
+import itertools
 from decimal import ROUND_CEILING, ROUND_HALF_UP, Decimal
 from typing import Callable
 
@@ -8,6 +10,79 @@ from src.decimal.dollar import Dollar
 from src.decimal.rate import Rate
 from src.purchase import Purchase
 
+# Interest is deductible on up to this much of a loan
+MAX_DEDUCTIBLE_LOAN_AMOUNT = Dollar(750000)
+
+
+class AmortizationSchedule:
+    # Month indexed (month 0 is the closing date): balance[m] is what is owed after the m-th payment
+    def __init__(self, interest_rate: Decimal, loan_term_months: int, loan_amount: Dollar):
+        self.interest_rate = interest_rate
+        self.loan_term_months = loan_term_months
+        self.loan_amount = Dollar(loan_amount)
+        self.monthly_payment = _monthly_payment(interest_rate, loan_term_months, loan_amount)
+        self.principle = [Dollar(0)]
+        self.interest = [Dollar(0)]
+        self.balance = [self.loan_amount]
+        self.cumulative_principle = [Dollar(0)]
+        self.cumulative_interest = [Dollar(0)]
+
+        balance = self.loan_amount
+        rate = Decimal(interest_rate).quantize(Decimal('.000001'))
+        while True:
+            interest_unrounded = balance * rate * Decimal(1) / c.MONTHS_PER_YEAR
+            interest = Dollar(interest_unrounded).quantize(c.TENTH_PLACE_QUANTIZE, rounding=ROUND_HALF_UP)
+            last = self.monthly_payment >= balance + interest
+            principle = balance if last else self.monthly_payment - interest
+            balance -= principle
+            self.principle.append(principle)
+            self.interest.append(interest)
+            self.balance.append(balance)
+            self.cumulative_principle.append(self.cumulative_principle[-1] + principle)
+            self.cumulative_interest.append(self.cumulative_interest[-1] + interest)
+            if last:
+                break
+
+        # Shared by every mortgage with the same terms, so freeze it
+        self.principle = tuple(self.principle)
+        self.interest = tuple(self.interest)
+        self.balance = tuple(self.balance)
+        self.cumulative_principle = tuple(self.cumulative_principle)
+        self.cumulative_interest = tuple(self.cumulative_interest)
+
+    def __len__(self):
+        return len(self.principle) - 1
+
+    def principle_between(self, start_month, end_month):
+        return self.cumulative_principle[end_month] - self.cumulative_principle[start_month - 1]
+
+    def interest_between(self, start_month, end_month):
+        return self.cumulative_interest[end_month] - self.cumulative_interest[start_month - 1]
+
+    @functools.cached_property
+    def arrays(self):
+        import numpy as np
+        arrays = dict(
+            principle=np.array(self.principle, dtype=float),
+            interest=np.array(self.interest, dtype=float),
+            balance=np.array(self.balance, dtype=float),
+        )
+        for array in arrays.values():
+            array.setflags(write=False)
+        return arrays
+
+
+@functools.lru_cache(maxsize=256)
+def amortization_schedule(interest_rate: Decimal, loan_term_months: int, loan_amount: Dollar):
+    return AmortizationSchedule(interest_rate, loan_term_months, loan_amount)
+
+
+def _monthly_payment(interest_rate, loan_term_months, loan_amount):
+    month_growth = 1. + float(interest_rate) / c.MONTHS_PER_YEAR
+    pre_amt = float(loan_amount) * float(interest_rate) / (
+            float(c.MONTHS_PER_YEAR) * (1. - (1. / month_growth) ** loan_term_months))
+    return Dollar(Decimal(pre_amt).quantize(c.TENTH_PLACE_QUANTIZE, rounding=ROUND_CEILING))
+
 
 class MortgageBase:
     def __init__(self, interest_rate: Rate, loan_term_years: int, loan_amount: Dollar):
@@ -18,37 +93,23 @@ class MortgageBase:
         self.month_growth = 1. + float(self.interest_rate) / c.MONTHS_PER_YEAR
         self.apy = self.month_growth ** c.MONTHS_PER_YEAR - 1
 
+    @functools.cached_property
+    def schedule(self) -> AmortizationSchedule:
+        return amortization_schedule(Decimal(self.interest_rate), self.loan_term_months, self.loan_amount)
+
     def monthly_payment(self):
-        pre_amt = float(self.loan_amount) * float(self.interest_rate) / (
-                float(c.MONTHS_PER_YEAR) * (1. - (1. / self.month_growth) ** self.loan_term_months))
-        return Dollar(pre_amt).quantize(c.TENTH_PLACE_QUANTIZE, rounding=ROUND_CEILING)
+        return _monthly_payment(self.interest_rate, self.loan_term_months, self.loan_amount)
 
     def monthly_payment_schedule(self):
-        monthly = self.monthly_payment()
-        balance = self.loan_amount
-        rate = Decimal(self.interest_rate).quantize(Decimal('.000001'))
-        while True:
-            interest_unrounded = balance * rate * Decimal(1) / c.MONTHS_PER_YEAR
-            interest = Dollar(interest_unrounded).quantize(c.TENTH_PLACE_QUANTIZE, rounding=ROUND_HALF_UP)
-            if monthly >= balance + interest:
-                yield balance, interest
-                break
-            principle = monthly - interest
-            yield principle, interest
-            balance -= principle
+        schedule = self.schedule
+        for month in range(1, len(schedule) + 1):
+            yield schedule.principle[month], schedule.interest[month]
 
     def yearly_payment_schedule(self):
-        yearly_principle = Decimal(0)
-        yearly_interest = Decimal(0)
-        for index, payment in enumerate(self.monthly_payment_schedule()):
-            month_num = index + 1
-            monthly_principle, monthly_interest = payment
-            yearly_principle += monthly_principle
-            yearly_interest += monthly_interest
-            if month_num % 12 == 0:
-                yield yearly_principle, yearly_interest
-                yearly_principle = Decimal(0)
-                yearly_interest = Decimal(0)
+        schedule = self.schedule
+        for year in range(1, len(schedule) // c.MONTHS_PER_YEAR + 1):
+            start_month, end_month = (year - 1) * c.MONTHS_PER_YEAR + 1, year * c.MONTHS_PER_YEAR
+            yield schedule.principle_between(start_month, end_month), schedule.interest_between(start_month, end_month)
 
 
 class Mortgage(MortgageBase):
@@ -56,7 +117,7 @@ class Mortgage(MortgageBase):
         self.max_deductible_mortgage = MortgageBase(
             interest_rate=interest_rate,
             loan_term_years=loan_term_years,
-            loan_amount=Dollar(750000)
+            loan_amount=MAX_DEDUCTIBLE_LOAN_AMOUNT
         )
 
         super().__init__(
@@ -65,29 +126,37 @@ class Mortgage(MortgageBase):
             loan_amount=purchase.price - purchase.down_payment
         )
 
-    def monthly_mortgage_schedule(self):
-        max_deductible_mortgage_itr = self.max_deductible_mortgage.monthly_payment_schedule()
+    @functools.cached_property
+    def deductible_interest(self):
+        max_deductible_interest = self.max_deductible_mortgage.schedule.interest
+        return [
+            min(max_deductible_interest[month] if month < len(max_deductible_interest) else Dollar(0), interest)
+            for month, interest in enumerate(self.schedule.interest)
+        ]
 
-        for index, payment in enumerate(super().monthly_payment_schedule()):
-            month_num = index + 1
-            principle, interest = payment
-            max_deductible_interest = next(max_deductible_mortgage_itr)[1]
-            deductible_interest = min(max_deductible_interest, interest)
-            yield month_num, principle, interest, deductible_interest
+    @functools.cached_property
+    def cumulative_deductible_interest(self):
+        return list(itertools.accumulate(self.deductible_interest))
+
+    def deductible_interest_between(self, start_month, end_month):
+        return self.cumulative_deductible_interest[end_month] - self.cumulative_deductible_interest[start_month - 1]
+
+    def monthly_mortgage_schedule(self):
+        schedule = self.schedule
+        for month_num in range(1, len(schedule) + 1):
+            principle, interest = schedule.principle[month_num], schedule.interest[month_num]
+            yield month_num, principle, interest, self.deductible_interest[month_num]
 
     def yearly_mortgage_schedule(self):
-        yearly_principle = Dollar(0)
-        yearly_interest = Dollar(0)
-        yearly_deductible_interest = Dollar(0)
-        for month_num, principle, interest, deductible_interest in self.monthly_mortgage_schedule():
-            yearly_principle += principle
-            yearly_interest += interest
-            yearly_deductible_interest += deductible_interest
-            if month_num % 12 == 0:
-                yield (month_num / 12), yearly_principle, yearly_interest, yearly_deductible_interest
-                yearly_principle = Dollar(0)
-                yearly_interest = Dollar(0)
-                yearly_deductible_interest = Dollar(0)
+        schedule = self.schedule
+        for year in range(1, len(schedule) // c.MONTHS_PER_YEAR + 1):
+            start_month, end_month = (year - 1) * c.MONTHS_PER_YEAR + 1, year * c.MONTHS_PER_YEAR
+            yield (
+                end_month / 12,
+                schedule.principle_between(start_month, end_month),
+                schedule.interest_between(start_month, end_month),
+                self.deductible_interest_between(start_month, end_month),
+            )
 
 
 MortgageFactoryType = Callable[[Purchase], Mortgage]
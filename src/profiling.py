@@ -0,0 +1,96 @@
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+
+# Set to 1 to print a per-stage report when the process exits, or to a path ending in .json to write it there instead
+PROFILE_ENV = 'HOUSING_PROFILE'
+
+_active = []
+
+
+class Profile(object):
+    def __init__(self):
+        self.calls = {}
+        self.seconds = {}
+
+    def record(self, stage, seconds):
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        self.seconds[stage] = self.seconds.get(stage, 0.) + seconds
+
+    def report(self):
+        # Stage times are inclusive, e.g. factory.taxes includes taxes.tax_deduction_per_year
+        return [
+            dict(stage=stage, calls=self.calls[stage], seconds=seconds, seconds_per_call=seconds / self.calls[stage])
+            for stage, seconds in sorted(self.seconds.items(), key=lambda item: -item[1])
+        ]
+
+    def __str__(self):
+        lines = [f'{"stage":<40} {"calls":>8} {"total ms":>10} {"ms/call":>10}']
+        for row in self.report():
+            milliseconds, milliseconds_per_call = row['seconds'] * 1000, row['seconds_per_call'] * 1000
+            lines.append(f'{row["stage"]:<40} {row["calls"]:>8} {milliseconds:>10.2f} {milliseconds_per_call:>10.3f}')
+        return '\n'.join(lines)
+
+
+@contextlib.contextmanager
+def profile():
+    p = Profile()
+    _active.append(p)
+    try:
+        yield p
+    finally:
+        _active.remove(p)
+
+
+@contextlib.contextmanager
+def timed(stage):
+    if not _active:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        for p in _active:
+            p.record(stage, seconds)
+
+
+def stage(name):
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return f(*args, **kwargs)
+            with timed(name):
+                return f(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _profile_from_env():
+    destination = os.environ.get(PROFILE_ENV)
+    if not destination or destination == '0':
+        return
+
+    p = Profile()
+    _active.append(p)
+
+    def output():
+        if destination.endswith('.json'):
+            with open(destination, 'w') as f:
+                json.dump(p.report(), f, indent=2)
+        else:
+            print(f'\n{p}', file=sys.stderr)
+
+    atexit.register(output)
+
+
+_profile_from_env()
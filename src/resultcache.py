@@ -0,0 +1,105 @@
+import os
+import tempfile
+
+# Shared by every run, user and sweep job that points at the same directory
+CACHE_DIR_ENV = 'HOUSING_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'housing-profit-calculator')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+# Puts between scans of the directory for eviction, the first put of a process always scans
+EVICT_EVERY = 32
+SUFFIX = '.bin'
+
+
+class ResultCache(object):
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._puts_until_evict = 0
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], key + SUFFIX)
+
+    def get(self, key):
+        # Entries are only ever replaced whole, so a reader sees a complete entry or none
+        path = self._file(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        # The modification time orders entries for eviction, a hit makes an entry the most recently used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        path = self._file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self._puts_until_evict -= 1
+        if self._puts_until_evict <= 0:
+            self._puts_until_evict = EVICT_EVERY
+            self.evict()
+
+    def delete(self, key):
+        try:
+            os.unlink(self._file(key))
+        except FileNotFoundError:
+            pass
+
+    def _entries(self):
+        for directory, _, filenames in os.walk(self.path):
+            for filename in filenames:
+                if filename.endswith(SUFFIX):
+                    path = os.path.join(directory, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        # Removes the least recently used entries until the cache fits in max_bytes. One process evicts at a time, the
+        # others skip it rather than wait
+        try:
+            import fcntl
+        except ImportError:
+            # No POSIX locks, e.g. on Windows, processes may evict at the same time, which only unlinks an entry twice
+            fcntl = None
+
+        with open(os.path.join(self.path, '.lock'), 'w') as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return
+
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
@@ -0,0 +1,132 @@
+import json
+import os
+
+import numpy as np
+
+import src.constants as c
+from src.breakdown.columns import MONTH_COLUMNS, YEAR_COLUMNS
+from src.breakdown.vectorizedengine import yearly_arrays
+from src.scenariospec import SPEC_PATHS
+
+# Appends between writes of the scenario count, which is how far readers of a store that is still being written see
+FLUSH_EVERY = 1024
+_META = 'meta.json'
+
+
+def scenario_arrays(home_investment):
+    # Monthly and yearly columns of a scenario as float64 arrays, the vectorized engine's own arrays when it is used
+    monthly = home_investment.breakdown.monthly
+    if home_investment.breakdown.engine == 'vectorized':
+        months = monthly.arrays()
+    else:
+        timeline = monthly.list()
+        months = {column.name: timeline.array(column.name) for column in MONTH_COLUMNS}
+    months = {name: values.astype(float) for name, values in months.items()}
+    loan_term_months = home_investment.mortgage.loan_term_months
+    return months, yearly_arrays(months, loan_term_months, float(home_investment.purchase.cost_initial))
+
+
+def _write_meta(path, meta):
+    # Replaced whole, a reader sees the count before or after an append
+    tmp_path = os.path.join(path, f'{_META}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(path, _META))
+
+
+class ResultStore(object):
+    # A directory of .npy files, one (scenarios x months) or (scenarios x years) float64 array per breakdown column and
+    # one (scenarios,) array per param, preallocated for capacity scenarios and memory mapped, so a store larger than
+    # memory is read a column at a time and only the pages a query touches are loaded. Rows after the end of a
+    # scenario's breakdown and unset params are NaN
+    def __init__(self, path, mode='r'):
+        assert mode in ('r', 'r+'), f'Unknown mode {mode}'
+        self.path = path
+        self.mode = mode
+        with open(os.path.join(path, _META)) as f:
+            meta = json.load(f)
+        self.capacity = meta['capacity']
+        self.months = meta['months']
+        self.years = meta['years']
+        self.count = meta['count']
+        self._arrays = {}
+        self._unflushed = 0
+
+    @classmethod
+    def create(cls, path, capacity, loan_term_years=30):
+        # Sized for loans of up to loan_term_years, plus the month a loan with a sub-cent balance can run over
+        months = loan_term_years * c.MONTHS_PER_YEAR + 2
+        years = loan_term_years + 2
+        os.makedirs(path)
+        for directory, names, length in (
+                ('month', [column.name for column in MONTH_COLUMNS], months),
+                ('year', [name for name, _ in YEAR_COLUMNS], years),
+                ('params', SPEC_PATHS, None),
+        ):
+            os.makedirs(os.path.join(path, directory))
+            shape = (capacity,) if length is None else (capacity, length)
+            for name in names:
+                np.lib.format.open_memmap(os.path.join(path, directory, f'{name}.npy'), 'w+', '<f8', shape)
+        _write_meta(path, dict(capacity=capacity, months=months, years=years, count=0))
+        return cls(path, 'r+')
+
+    def _array(self, directory, name):
+        key = (directory, name)
+        if key not in self._arrays:
+            file = os.path.join(self.path, directory, f'{name}.npy')
+            assert os.path.exists(file), f'No {directory} column {name} in {self.path}'
+            self._arrays[key] = np.load(file, mmap_mode=self.mode)
+        return self._arrays[key]
+
+    def put(self, index, spec, months: dict[str, np.ndarray], years: dict[str, np.ndarray]):
+        # Writes a scenario without counting it, processes can put disjoint scenarios of the same store at once
+        assert self.mode == 'r+', 'The store was opened read only'
+        assert 0 <= index < self.capacity, f'Scenario {index} is outside of a store of {self.capacity}'
+        for directory, arrays, length in (('month', months, self.months), ('year', years, self.years)):
+            for name, values in arrays.items():
+                assert len(values) <= length, f'{len(values)} {directory}s do not fit the store\'s {length}'
+                row = self._array(directory, name)[index]
+                row[:len(values)] = values
+                row[len(values):] = np.nan
+        for path, value in zip(SPEC_PATHS, spec.values()):
+            self._array('params', path)[index] = np.nan if value is None else value
+
+    def append(self, spec, months: dict[str, np.ndarray], years: dict[str, np.ndarray]):
+        # Index of the scenario, e.g. from ScenarioSpec and scenario_arrays(spec.home_investment())
+        self.put(self.count, spec, months, years)
+        self.advance()
+        return self.count - 1
+
+    def advance(self, count=1):
+        # Counts scenarios that were put in order, readers see them once the count is flushed
+        assert self.count + count <= self.capacity, f'The store is full at {self.capacity} scenarios'
+        self.count += count
+        self._unflushed += count
+        if self._unflushed >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        for array in self._arrays.values():
+            array.flush()
+        _write_meta(self.path, dict(capacity=self.capacity, months=self.months, years=self.years, count=self.count))
+        self._unflushed = 0
+
+    def month(self, name):
+        # (scenarios x months) view of a monthly column, e.g. store.month('score')[:, 120]
+        return self._array('month', name)[:self.count]
+
+    def year(self, name):
+        # (scenarios x years) view of a yearly column, year 0 is the closing month
+        return self._array('year', name)[:self.count]
+
+    def params(self, path):
+        # A param of every scenario by its dotted path, e.g. 'purchase.down_payment_percent'
+        return self._array('params', path)[:self.count]
+
+    def where(self, conditions: dict):
+        # Indices of the scenarios whose params equal the given values, or any of a list of values
+        mask = np.ones(self.count, dtype=bool)
+        for path, value in conditions.items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            mask &= np.isin(self.params(path), np.asarray(values, dtype=float))
+        return np.flatnonzero(mask)
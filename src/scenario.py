@@ -0,0 +1,170 @@
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import numbers
+import pathlib
+
+from src.helpers import yaml_safe_load
+from src.homeinvestment import COMPONENT_DEPENDENCIES, HomeInvestment
+from src.income import income
+from src.mortgage import mortgage
+from src.operatingexpenses import operating_expenses
+from src.purchase import purchase
+from src.sale import sale
+from src.taxes import FEDERAL_TAXES_PATH, STATE_TAXES_PATH, taxes
+
+# Scenario params mirror the HomeInvestment factories, e.g. dict(purchase=dict(price=800000, ...), mortgage=dict(...))
+FACTORIES = dict(
+    purchase=purchase,
+    mortgage=mortgage,
+    taxes=taxes,
+    operating_expenses=operating_expenses,
+    income=income,
+    sale=sale,
+)
+
+# Bump whenever a change to the model changes its results, which invalidates cached results and output directories
+MODEL_VERSION = 1
+
+# Flat keys of the yaml files in scenarios/ and the param path each one sets
+YAML_KEYS = {
+    'purchase_price': 'purchase.price',
+    'down_payment': 'purchase.down_payment',
+    'down_payment_percent': 'purchase.down_payment_percent',
+    'purchase_closing_cost_percent': 'purchase.closing_cost_percent',
+    'interest_rate_percent': 'mortgage.interest_rate_percent',
+    'loan_term_years': 'mortgage.loan_term_years',
+    'property_tax_rate_percent': 'taxes.property_tax_percent',
+    'property_tax_annual_increase_percent': 'taxes.property_tax_annual_increase_percent',
+    'federal_tax_rate_percent': 'taxes.federal_tax_rate_percent',
+    'state_tax_rate_percent': 'taxes.state_tax_rate_percent',
+    'yearly_income': 'taxes.yearly_income',
+    'homeowners_insurance_rate_percent': 'operating_expenses.hoi_percent',
+    'homeowners_insurance_annual_increase_percent': 'operating_expenses.hoi_annual_increase_percent',
+    'hoa': 'operating_expenses.hoa',
+    'hoa_annual_increase_percent': 'operating_expenses.hoa_annual_increase_percent',
+    'maintenance_fee_percent': 'operating_expenses.maintenance_percent',
+    'maintenance_fee_annual_increase_percent': 'operating_expenses.maintenance_annual_increase_percent',
+    'other_percent': 'operating_expenses.other_percent',
+    'other_annual_increase_percent': 'operating_expenses.other_annual_increase_percent',
+    'rent': 'income.rent',
+    'rent_control_percent': 'income.rent_annual_increase_percent',
+    'tenant_rent': 'income.tenant_rent',
+    'tenant_rent_control_percent': 'income.tenant_rent_annual_increase_percent',
+    'vacancy_rate_percent': 'income.vacancy_percent',
+    'management_fee_percent': 'income.management_fee_percent',
+    'sale_closing_cost_percent': 'sale.closing_cost_percent',
+    'annual_appreciation_percent': 'sale.annual_appreciation_percent',
+    'index_fund_annual_return_percent': 'index_fund_annual_return_percent',
+}
+
+
+def params_from_yaml(path):
+    house_params = yaml_safe_load(path)
+    unknown = set(house_params) - set(YAML_KEYS)
+    assert not unknown, f'Unknown keys in {path}: {", ".join(sorted(unknown))}'
+    changes = {YAML_KEYS[k]: v for k, v in house_params.items()}
+    return with_params(dict(scenario_name=pathlib.Path(path).stem), changes)
+
+
+def _factory_kwargs(factory, kwargs):
+    # Optional factory arguments may be left out of the params, they default to None like in the yaml scenarios
+    unknown = set(kwargs) - set(inspect.signature(factory).parameters)
+    assert not unknown, f'Unknown {factory.__name__} params: {", ".join(sorted(unknown))}'
+    return {k: kwargs.get(k) for k in inspect.signature(factory).parameters}
+
+
+def build_home_investment(params, **kwargs) -> HomeInvestment:
+    if kwargs.get('cache') is not None and not kwargs.get('cache_key'):
+        kwargs['cache_key'] = scenario_hash(params)
+    return HomeInvestment(
+        scenario_name=params.get('scenario_name', 'scenario'),
+        index_fund_annual_return_percent=params.get('index_fund_annual_return_percent'),
+        **{name: factory(**_factory_kwargs(factory, params.get(name, {}))) for name, factory in FACTORIES.items()},
+        **kwargs,
+    )
+
+
+# The component each top level param is an input of, the factory params set the component of the same name
+PARAM_COMPONENTS = {name: name for name in FACTORIES} | dict(
+    index_fund_annual_return_percent='index_fund_monthly_growth'
+)
+
+
+def stale_components(paths):
+    # Components that have to be rebuilt when the given dotted param paths change, including everything built from them
+    stale = {PARAM_COMPONENTS[path.split('.')[0]] for path in paths if path.split('.')[0] in PARAM_COMPONENTS}
+    while True:
+        dependents = {name for name, needs in COMPONENT_DEPENDENCIES.items() if stale.intersection(needs)}
+        if dependents <= stale:
+            return stale
+        stale |= dependents
+
+
+class Scenario(object):
+    def __init__(self, params, **kwargs):
+        # kwargs are passed on to HomeInvestment, e.g. breakdown_engine or output_dir
+        self.params = params
+        self._kwargs = kwargs
+        # HomeInvestment of an earlier scenario and the components this one can share with it
+        self._reuse_from = None
+        self._reused = set()
+
+    @functools.cached_property
+    def home_investment(self) -> HomeInvestment:
+        home_investment = build_home_investment(self.params, **self._kwargs)
+        if self._reuse_from is not None:
+            home_investment.reuse_components(self._reuse_from, self._reused)
+            self._reuse_from = None
+        return home_investment
+
+    def with_changes(self, changes, **kwargs):
+        # A scenario with the dotted param paths in changes set, sharing every component whose inputs did not change,
+        # e.g. a new appreciation rate keeps the mortgage schedule, tax deductions and tax savings
+        scenario = Scenario(with_params(self.params, changes), **(self._kwargs | kwargs))
+        reused = set(COMPONENT_DEPENDENCIES) - stale_components(changes)
+        if 'home_investment' in self.__dict__:
+            scenario._reuse_from, scenario._reused = self.home_investment, reused
+        elif self._reuse_from is not None:
+            scenario._reuse_from, scenario._reused = self._reuse_from, reused & self._reused
+        return scenario
+
+
+def get_param(params, path):
+    for key in path.split('.'):
+        params = params.get(key) if params is not None else None
+    return params
+
+
+def with_params(params, changes):
+    # Returns a copy of params with each dotted path in changes, e.g. 'purchase.price', set to its value
+    params = copy.deepcopy(params)
+    for path, value in changes.items():
+        *parents, key = path.split('.')
+        node = params
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = value
+    return params
+
+
+def _normalize(value):
+    # 20 and 20.0 are the same input, and unset optional params are the same as None
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, numbers.Number) and not isinstance(value, bool):
+        return repr(float(value))
+    return value
+
+
+def scenario_hash(params):
+    # Changes whenever the inputs, the tax tables or the model a scenario is evaluated with change, not with its name
+    h = hashlib.sha256(f'model {MODEL_VERSION}\n'.encode())
+    normalized = _normalize({k: v for k, v in params.items() if k != 'scenario_name'})
+    h.update(json.dumps(normalized, sort_keys=True).encode())
+    for path in (FEDERAL_TAXES_PATH, STATE_TAXES_PATH):
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
@@ -0,0 +1,189 @@
+import functools
+import struct
+from typing import NamedTuple, Optional
+
+from src.homeinvestment import HomeInvestment
+from src.scenario import FACTORIES, YAML_KEYS, build_home_investment, params_from_yaml, scenario_hash
+
+
+# One spec per factory in FACTORIES, with the factory's params as fields. Every value is a float or None, so specs of
+# the same inputs compare and hash equal however the numbers were written
+class PurchaseSpec(NamedTuple):
+    price: Optional[float] = None
+    down_payment: Optional[float] = None
+    down_payment_percent: Optional[float] = None
+    closing_cost_percent: Optional[float] = None
+
+
+class MortgageSpec(NamedTuple):
+    interest_rate_percent: Optional[float] = None
+    loan_term_years: Optional[float] = None
+
+
+class TaxesSpec(NamedTuple):
+    property_tax_percent: Optional[float] = None
+    property_tax_annual_increase_percent: Optional[float] = None
+    federal_tax_rate_percent: Optional[float] = None
+    state_tax_rate_percent: Optional[float] = None
+    yearly_income: Optional[float] = None
+
+
+class OperatingExpensesSpec(NamedTuple):
+    hoi_percent: Optional[float] = None
+    hoi_annual_increase_percent: Optional[float] = None
+    hoa: Optional[float] = None
+    hoa_annual_increase_percent: Optional[float] = None
+    maintenance_percent: Optional[float] = None
+    maintenance_annual_increase_percent: Optional[float] = None
+    other_percent: Optional[float] = None
+    other_annual_increase_percent: Optional[float] = None
+
+
+class IncomeSpec(NamedTuple):
+    rent: Optional[float] = None
+    rent_annual_increase_percent: Optional[float] = None
+    tenant_rent: Optional[float] = None
+    tenant_rent_annual_increase_percent: Optional[float] = None
+    vacancy_percent: Optional[float] = None
+    management_fee_percent: Optional[float] = None
+
+
+class SaleSpec(NamedTuple):
+    closing_cost_percent: Optional[float] = None
+    annual_appreciation_percent: Optional[float] = None
+
+
+COMPONENT_SPECS = dict(
+    purchase=PurchaseSpec,
+    mortgage=MortgageSpec,
+    taxes=TaxesSpec,
+    operating_expenses=OperatingExpensesSpec,
+    income=IncomeSpec,
+    sale=SaleSpec,
+)
+# Dotted param path of every number of a ScenarioSpec, in encoding order
+SPEC_PATHS = [
+    f'{name}.{field}' for name, spec in COMPONENT_SPECS.items() for field in spec._fields
+] + ['index_fund_annual_return_percent']
+# A bitmask of the numbers that are set, the set numbers as doubles, then the utf-8 scenario name
+_HEADER = struct.Struct('<Q')
+assert len(SPEC_PATHS) <= _HEADER.size * 8
+_DOUBLES = [struct.Struct(f'<{count}d') for count in range(len(SPEC_PATHS) + 1)]
+# Spec of each component and where its fields start and stop in SPEC_PATHS
+_SPANS = [
+    (spec, SPEC_PATHS.index(f'{name}.{spec._fields[0]}'), SPEC_PATHS.index(f'{name}.{spec._fields[-1]}') + 1)
+    for name, spec in COMPONENT_SPECS.items()
+]
+
+
+@functools.cache
+def _layout(mask):
+    # Struct of the set numbers of a mask and their indices, the scenarios of a sweep share a handful of masks
+    indices = [index for index in range(len(SPEC_PATHS)) if mask >> index & 1]
+    return _DOUBLES[len(indices)], indices
+
+
+def _float(value):
+    return None if value is None else float(value)
+
+
+class ScenarioSpec(NamedTuple):
+    purchase: PurchaseSpec = PurchaseSpec()
+    mortgage: MortgageSpec = MortgageSpec()
+    taxes: TaxesSpec = TaxesSpec()
+    operating_expenses: OperatingExpensesSpec = OperatingExpensesSpec()
+    income: IncomeSpec = IncomeSpec()
+    sale: SaleSpec = SaleSpec()
+    index_fund_annual_return_percent: Optional[float] = None
+    scenario_name: str = 'scenario'
+
+    # The scenario name labels the inputs and is not one of them, specs of the same inputs from differently named yaml
+    # files compare and hash equal like their digests
+    def __eq__(self, other):
+        return self[:-1] == other[:-1] if isinstance(other, ScenarioSpec) else NotImplemented
+
+    def __ne__(self, other):
+        return self[:-1] != other[:-1] if isinstance(other, ScenarioSpec) else NotImplemented
+
+    def __hash__(self):
+        return hash(self[:-1])
+
+    @classmethod
+    def from_params(cls, params):
+        for name, component in params.items():
+            if name in COMPONENT_SPECS:
+                unknown = set(component) - set(COMPONENT_SPECS[name]._fields)
+                assert not unknown, f'Unknown {name} params: {", ".join(sorted(unknown))}'
+        return cls(
+            **{
+                name: spec(**{k: _float(v) for k, v in params.get(name, {}).items()})
+                for name, spec in COMPONENT_SPECS.items()
+            },
+            index_fund_annual_return_percent=_float(params.get('index_fund_annual_return_percent')),
+            scenario_name=params.get('scenario_name', 'scenario'),
+        )
+
+    @classmethod
+    def from_yaml(cls, path):
+        return cls.from_params(params_from_yaml(path))
+
+    def params(self):
+        # The nested params dict build_home_investment and scenario_hash take, without the unset values
+        params = {
+            name: {k: v for k, v in getattr(self, name)._asdict().items() if v is not None} for name in FACTORIES
+        }
+        if self.index_fund_annual_return_percent is not None:
+            params['index_fund_annual_return_percent'] = self.index_fund_annual_return_percent
+        return dict(scenario_name=self.scenario_name) | params
+
+    def values(self):
+        # Every number in SPEC_PATHS order
+        return [*self.purchase, *self.mortgage, *self.taxes, *self.operating_expenses, *self.income, *self.sale,
+                self.index_fund_annual_return_percent]
+
+    def yaml_params(self):
+        # The flat keys of the yaml files in scenarios/, the scenario name is the file name
+        values = dict(zip(SPEC_PATHS, self.values()))
+        return {
+            key: int(values[path]) if values[path] % 1 == 0 else values[path]
+            for key, path in YAML_KEYS.items() if values[path] is not None
+        }
+
+    def to_yaml(self):
+        import yaml
+
+        return yaml.safe_dump(self.yaml_params(), sort_keys=False)
+
+    def digest(self):
+        # Stable across processes, where hash() salts the scenario name. Like scenario_hash, it covers the inputs, the
+        # tax tables and the model version but not the name
+        return scenario_hash(self.params())
+
+    def home_investment(self, **kwargs) -> HomeInvestment:
+        return build_home_investment(self.params(), **kwargs)
+
+    def encode(self) -> bytes:
+        values = self.values()
+        present = [v for v in values if v is not None]
+        mask = 0
+        for index, v in enumerate(values):
+            if v is not None:
+                mask |= 1 << index
+        return _HEADER.pack(mask) + _DOUBLES[len(present)].pack(*present) + self.scenario_name.encode()
+
+    @classmethod
+    def decode(cls, data):
+        (mask,) = _HEADER.unpack_from(data)
+        doubles, indices = _layout(mask)
+        values = [None] * len(SPEC_PATHS)
+        for index, value in zip(indices, doubles.unpack_from(data, _HEADER.size)):
+            values[index] = value
+        return cls._make([
+            *[spec._make(values[start:stop]) for spec, start, stop in _SPANS],
+            values[-1],
+            data[_HEADER.size + doubles.size:].decode(),
+        ])
+
+    def __reduce__(self):
+        # Pickles as its compact encoding, e.g. when sent to process pool workers
+        return ScenarioSpec.decode, (self.encode(),)
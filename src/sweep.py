@@ -0,0 +1,156 @@
+import argparse
+import csv
+import itertools
+import math
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+import src.constants as c
+from src.helpers import yaml_safe_load
+from src.homeinvestment import HomeInvestment
+from src.resultstore import ResultStore, scenario_arrays
+from src.scenario import get_param, with_params
+from src.scenariospec import ScenarioSpec
+
+SUMMARY_COLUMNS = ['score', 'home_roi', 'index_fund_roi', 'break_even_year']
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description='Evaluate a grid of home investment scenarios')
+    parser.add_argument(
+        '-i', '--input',
+        help='Path to a yaml file with a base scenario and a grid of dotted param paths to lists of values',
+        required=True,
+        type=os.path.abspath
+    )
+    parser.add_argument(
+        '-o', '--output',
+        help='Path of the summary csv to write',
+        required=True,
+        type=os.path.abspath
+    )
+    parser.add_argument(
+        '-p', '--processes',
+        help='Number of worker processes, defaults to the number of cores',
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        '-c', '--chunksize',
+        help='Number of scenarios sent to a worker at a time, defaults to a few chunks per worker',
+        type=int,
+        default=None
+    )
+    parser.add_argument(
+        '-e', '--engine',
+        help='Breakdown engine used by the workers',
+        choices=['decimal', 'vectorized', 'yearly'],
+        default='vectorized'
+    )
+    parser.add_argument(
+        '-s', '--store',
+        help='Directory of a new result store to also write every scenario\'s monthly and yearly columns to',
+        type=os.path.abspath,
+        default=None
+    )
+    return parser.parse_args(sys.argv[1:])
+
+
+def grid_size(grid):
+    return math.prod(len(values) for values in grid.values())
+
+
+def expand_grid(base, grid):
+    paths = list(grid)
+    for values in itertools.product(*(grid[path] for path in paths)):
+        yield dict(zip(paths, values)), with_params(base, dict(zip(paths, values)))
+
+
+def break_even_years(month, score):
+    # First year that ends with the home investment ahead of the index fund, along the last axis of the months, or nan.
+    # A nan score, e.g. past the end of a scenario's loan, is never ahead
+    even = (month > 0) & (month % c.MONTHS_PER_YEAR == 0) & (score >= 0)
+    return np.fmin.reduce(np.where(even, month // c.MONTHS_PER_YEAR, np.nan), axis=-1)
+
+
+def summarize(home_investment: HomeInvestment):
+    # Score of the last month plus the first year that ends with the home investment ahead of the index fund
+    breakdown = home_investment.breakdown
+    names = ['month', 'score', 'home_roi', 'index_fund_roi']
+    if breakdown.engine == 'vectorized':
+        arrays = breakdown.monthly.arrays(names)
+    else:
+        # The yearly rows hold the values of the last month of each year, which is all the summary reads
+        timeline = breakdown.yearly.list() if breakdown.engine == 'yearly' else breakdown.monthly.list()
+        arrays = {name: np.array(timeline.column(name), dtype=float) for name in names}
+
+    break_even_year = break_even_years(arrays['month'], arrays['score'])
+    return dict(
+        score=float(arrays['score'][-1]),
+        home_roi=float(arrays['home_roi'][-1]),
+        index_fund_roi=float(arrays['index_fund_roi'][-1]),
+        break_even_year=None if np.isnan(break_even_year) else int(break_even_year),
+    )
+
+
+# Result store of each worker process by path, opened by its first scenario
+_STORES = {}
+
+
+def _evaluate(args):
+    point, spec, engine, index, store_path = args
+    home_investment = spec.home_investment(breakdown_engine=engine)
+    if store_path is not None:
+        # Written by the worker, only the summary is sent back
+        if store_path not in _STORES:
+            _STORES[store_path] = ResultStore(store_path, 'r+')
+        _STORES[store_path].put(index, spec, *scenario_arrays(home_investment))
+    return point | summarize(home_investment)
+
+
+def sweep(base, grid, output_path, processes=None, chunksize=None, engine='vectorized', store_path=None):
+    processes = processes or os.cpu_count()
+    size = grid_size(grid)
+    chunksize = chunksize or max(1, size // (processes * 4))
+    # Specs pickle to a fraction of their params dicts, which is most of what is sent to the workers
+    tasks = (
+        (point, ScenarioSpec.from_params(params), engine, index, store_path)
+        for index, (point, params) in enumerate(expand_grid(base, grid))
+    )
+    store = None
+    if store_path is not None:
+        loan_term_years = max(grid.get('mortgage.loan_term_years', [get_param(base, 'mortgage.loan_term_years')]))
+        store = ResultStore.create(store_path, size, int(loan_term_years))
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', newline='') as f, multiprocessing.Pool(processes) as pool:
+        writer = csv.DictWriter(f, fieldnames=list(grid) + SUMMARY_COLUMNS)
+        writer.writeheader()
+        for row in pool.imap(_evaluate, tasks, chunksize=chunksize):
+            writer.writerow(row)
+            if store is not None:
+                # Scenarios keep the order of the csv rows
+                store.advance()
+
+    if store is not None:
+        store.flush()
+        print(f'Outputting {size} scenarios to {store_path}')
+    print(f'Outputting {size} scenarios to {output_path}\n')
+    return output_path
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    sweep_params = yaml_safe_load(args.input)
+    sweep(
+        base=sweep_params['base'],
+        grid=sweep_params['grid'],
+        output_path=args.output,
+        processes=args.processes,
+        chunksize=args.chunksize,
+        engine=args.engine,
+        store_path=args.store,
+    )
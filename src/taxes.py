@@ -1,3 +1,4 @@
+import functools
 from typing import Callable
 
 import src.constants as c
@@ -6,11 +7,28 @@ from src.decimal.dollarcompounding import DollarCompYearly
 from src.decimal.rate import Rate
 from src.helpers import rel, yaml_safe_load
 from src.mortgage import Mortgage
+from src.profiling import stage
 from src.purchase import Purchase
 
-STATE_TAXES = yaml_safe_load(rel('../taxes/state/ca.yaml'))
-FEDERAL_TAXES = yaml_safe_load(rel('../taxes/federal.yaml'))
-MAX_DEDUCTIBLE_PROPERTY_TAX = Dollar(FEDERAL_TAXES['property_tax_limit'])
+STATE_TAXES_PATH = rel('../taxes/state/ca.yaml')
+FEDERAL_TAXES_PATH = rel('../taxes/federal.yaml')
+
+
+# Tax tables are parsed on first use rather than on import
+@functools.cache
+def state_taxes():
+    return yaml_safe_load(STATE_TAXES_PATH)
+
+
+@functools.cache
+def federal_taxes():
+    return yaml_safe_load(FEDERAL_TAXES_PATH)
+
+
+def tax_deduction(deductible_interest, property_tax, yearly_income, dollar=Dollar, minimum=min):
+    # A year's itemized deduction of Dollars or, with np.asarray and np.minimum, of float arrays of scenarios
+    deductible_property_tax = minimum(property_tax, dollar(federal_taxes()['property_tax_limit']))
+    return minimum(deductible_property_tax + deductible_interest, yearly_income)
 
 
 class Taxes(object):
@@ -31,16 +49,23 @@ class Taxes(object):
         self.federal_tax_rate = federal_tax_rate
         self.state_tax_rate = state_tax_rate
         self.yearly_income = yearly_income
-        self.federal_standard_deduction = Dollar(FEDERAL_TAXES['standard_deduction'])
-        self.state_standard_deduction = Dollar(STATE_TAXES['standard_deduction'])
-        self.tax_deduction_per_year = self._calculate_tax_deduction_per_year(mortgage)
+        self.federal_standard_deduction = Dollar(federal_taxes()['standard_deduction'])
+        self.state_standard_deduction = Dollar(state_taxes()['standard_deduction'])
+        self._mortgage = mortgage
+
+    @functools.cached_property
+    def tax_deduction_per_year(self):
+        return self._calculate_tax_deduction_per_year(self._mortgage)
 
+    @stage('taxes.tax_deduction_per_year')
     def _calculate_tax_deduction_per_year(self, mortgage: Mortgage):
         tax_deduction_per_year = [0]
-        for year_num, principle, interest, deductible_interest in mortgage.yearly_mortgage_schedule():
-            deductible_property_tax = min(self.property_tax[0], MAX_DEDUCTIBLE_PROPERTY_TAX)
-            theoretical_deduction = deductible_property_tax + deductible_interest
-            tax_deduction_per_year.append(min(theoretical_deduction, self.yearly_income))
+        for year in range(1, len(mortgage.schedule) // c.MONTHS_PER_YEAR + 1):
+            deductible_interest = mortgage.deductible_interest_between(
+                start_month=(year - 1) * c.MONTHS_PER_YEAR + 1,
+                end_month=year * c.MONTHS_PER_YEAR,
+            )
+            tax_deduction_per_year.append(tax_deduction(deductible_interest, self.property_tax[0], self.yearly_income))
 
         return tax_deduction_per_year
 
@@ -1,149 +1,427 @@
-from src.helpers import folder_del_contents, rel, compound_interest
-from src.homeinvestment import HomeInvestment
-from src.income import income
-from src.mortgage import mortgage
-from src.operatingexpenses import operating_expenses
-from src.purchase import purchase
-from src.sale import sale
-from src.taxes import taxes
-
-
-def test_home_investment_condo():
-    return HomeInvestment(
-        scenario_name='home_investment_condo',
-        purchase=purchase(
-            price=800 * 1000,
-            down_payment=None,
-            down_payment_percent=20,
-            closing_cost_percent=2
-        ),
-        mortgage=mortgage(
-            interest_rate_percent=4.75,
-            loan_term_years=30
-        ),
-        taxes=taxes(
-            property_tax_percent=1.25,
-            property_tax_annual_increase_percent=2,
-            federal_tax_rate_percent=35,
-            state_tax_rate_percent=11.3,
-            yearly_income=500 * 1000,
-        ),
-        operating_expenses=operating_expenses(
-            hoi_percent=0.22,
-            hoi_annual_increase_percent=2,
-            hoa=325,
-            hoa_annual_increase_percent=2,
-            maintenance_percent=0.25,
-            maintenance_annual_increase_percent=2,
-            other_percent=None,
-            other_annual_increase_percent=None
-        ),
-        income=income(
-            rent=4000,
-            rent_annual_increase_percent=3,
-            tenant_rent=None,
-            tenant_rent_annual_increase_percent=None,
-            vacancy_percent=None,
-            management_fee_percent=None,
-        ),
-        sale=sale(
-            closing_cost_percent=8,
-            annual_appreciation_percent=3,
-        ),
-        index_fund_annual_return_percent=8,
+import csv
+import gc
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import unittest.mock
+import weakref
+
+import pytest
+import yaml
+
+from src.batch import RESULT_COLUMNS, evaluate
+from src.breakdown import decimalengine
+from src.breakdown.breakdownfor import VIEWS
+from src.breakdown.breakdownformonth import CHECKPOINT_MONTHS
+from src.breakdown.columns import MONTH_COLUMNS, dependency_order
+from src.breakdown.timeline import Timeline
+from src.breakdown.vectorizedengine import (
+    TOLERANCE_DOLLARS,
+    TOLERANCE_PERCENT,
+    breakdown_arrays,
+    evaluation_order,
+    inputs,
+    monthly_arrays,
+)
+from src.decimal.dollar import Dollar
+from src.decimal.percent import Percent
+from src.fixtures import FIXTURES
+from src.goalseek import at_year, goal_seek
+from src.helpers import folder_del_contents, rel, compound_interest, yaml_safe_load
+from src.main import main
+from src.memorybudget import MemoryBudget
+from src.montecarlo import RATES, Distribution, simulate
+from src.profiling import PROFILE_ENV, profile, stage, timed
+from src.resultcache import ResultCache
+from src.resultstore import ResultStore, scenario_arrays
+from src.scenario import Scenario, build_home_investment, params_from_yaml, scenario_hash, with_params
+from src.scenariospec import ScenarioSpec
+from src.sweep import expand_grid, grid_size, summarize, sweep
+
+
+def test_home_investment_condo(**kwargs):
+    return build_home_investment(FIXTURES['home_investment_condo'], **kwargs)
+
+
+def test_home_investment_low_interest_house(**kwargs):
+    return build_home_investment(FIXTURES['home_investment_low_interest_house'], **kwargs)
+
+
+def test_home_investment_low_interest_house_fully_rented(**kwargs):
+    return build_home_investment(FIXTURES['home_investment_low_interest_house_fully_rented'], **kwargs)
+
+
+def test_vectorized_breakdown_matches_decimal():
+    decimal_rows = test_home_investment_condo().breakdown.monthly.list()
+    vectorized_rows = test_home_investment_condo(breakdown_engine='vectorized').breakdown.monthly.list()
+    assert len(decimal_rows) == len(vectorized_rows)
+    for decimal_row, vectorized_row in zip(decimal_rows, vectorized_rows):
+        assert decimal_row.dict().keys() == vectorized_row.dict().keys()
+        for column in MONTH_COLUMNS:
+            tolerance = TOLERANCE_PERCENT if column.kind == 'percent' else TOLERANCE_DOLLARS
+            decimal_value, vectorized_value = getattr(decimal_row, column.name), getattr(vectorized_row, column.name)
+            assert abs(decimal_value - vectorized_value) <= tolerance, column.name
+
+
+def test_timeline_rows_match_generated_rows():
+    home_investment = test_home_investment_condo()
+    for breakdown in (home_investment.breakdown.monthly, home_investment.breakdown.yearly):
+        assert breakdown.dicts() == [row.dict() for row in breakdown.generator()]
+        assert breakdown.list()[-1].score == breakdown.list().column('score')[-1]
+
+
+def test_breakdown_random_access_matches_rows():
+    expected = test_home_investment_condo().breakdown
+    breakdown = test_home_investment_condo().breakdown
+    assert breakdown.monthly.at(240).dict() == expected.monthly.dicts()[240]
+    assert [row.dict() for row in breakdown.monthly.window(118, 130)] == expected.monthly.dicts()[118:130]
+    assert breakdown.yearly.at(20).dict() == expected.yearly.dicts()[20]
+
+    # A cold query builds month 0 and one row per year jumped, not every month before it
+    monthly = test_home_investment_condo().breakdown.monthly
+    build_row, calls = monthly._row, []
+    monthly._row = lambda *args: calls.append(args[0]) or build_row(*args)
+    assert monthly.at(245).dict() == expected.monthly.dicts()[245]
+    assert len(calls) == 1 + 240 // CHECKPOINT_MONTHS + 5
+
+    # Once list() is built, rows are read from it rather than rebuilt, cold rows can differ from it below a cent
+    monthly = build_home_investment(params_from_yaml(rel('scenarios/house.yaml'))).breakdown.monthly
+    rows, calls = monthly.list(), []
+    monthly._row = lambda *args: calls.append(args[0]) or build_row(*args)
+    assert monthly.at(240).index_fund_value == rows[240].index_fund_value
+    assert [row.dict() for row in monthly.window(118, 130)] == rows.dicts()[118:130]
+    assert not calls
+
+
+def test_yearly_engine_matches_decimal():
+    assert (
+        test_home_investment_low_interest_house(breakdown_engine='yearly').breakdown.yearly.dicts()
+        == test_home_investment_low_interest_house().breakdown.yearly.dicts()
     )
 
 
-def test_home_investment_low_interest_house():
-    return HomeInvestment(
-        scenario_name='home_investment_low_interest_house',
-        purchase=purchase(
-            price=900 * 1000,
-            down_payment=None,
-            down_payment_percent=20,
-            closing_cost_percent=2
-        ),
-        mortgage=mortgage(
-            interest_rate_percent=3.25,
-            loan_term_years=30
-        ),
-        taxes=taxes(
-            property_tax_percent=1.25,
-            property_tax_annual_increase_percent=2,
-            federal_tax_rate_percent=35,
-            state_tax_rate_percent=11.3,
-            yearly_income=500 * 1000,
-        ),
-        operating_expenses=operating_expenses(
-            hoi_percent=0.22,
-            hoi_annual_increase_percent=2,
-            hoa=None,
-            hoa_annual_increase_percent=None,
-            maintenance_percent=1,
-            maintenance_annual_increase_percent=2,
-            other_percent=None,
-            other_annual_increase_percent=None
-        ),
-        income=income(
-            rent=1650,
-            rent_annual_increase_percent=3,
-            tenant_rent=1600,
-            tenant_rent_annual_increase_percent=None,
-            vacancy_percent=None,
-            management_fee_percent=None,
-        ),
-        sale=sale(
-            closing_cost_percent=8,
-            annual_appreciation_percent=5,
-        ),
-        index_fund_annual_return_percent=10,
+def test_pruned_columns_match_full_breakdown():
+    i = inputs(test_home_investment_condo())
+    full = breakdown_arrays(i)
+    for name, values in full.items():
+        assert (breakdown_arrays(i, [name])[name] == values).all(), name
+    assert len(evaluation_order(['monthly_income'])) < len(evaluation_order()) / 3
+
+
+def test_decimal_view_export_computes_only_its_columns():
+    rows = list(test_home_investment_condo().breakdown.monthly.generator())
+    for name, values in decimalengine.breakdown_columns(test_home_investment_condo()).items():
+        assert values == [getattr(row, name) for row in rows], name
+    assert len(dependency_order(decimalengine.GRAPH, ['monthly_income'])) < len(decimalengine.GRAPH) / 3
+
+    # Written from the view's columns without building a RowMonth, the same as from the full rows
+    with tempfile.TemporaryDirectory() as path:
+        monthly = test_home_investment_condo(output_dir=f'{path}/pruned').breakdown.monthly
+        monthly._row = None
+        full = test_home_investment_condo(output_dir=f'{path}/full').breakdown.monthly
+        for view in ('income', 'investment_short'):
+            with open(monthly.export([view])[0]) as pruned, open(full.export([view], rows=full.list())[0]) as f:
+                assert pruned.read() == f.read(), view
+
+
+def test_final_values_match_golden_values():
+    # Values of the original implementation, every optimization has to keep them
+    golden = {
+        'home_investment_condo': ('$1,941,809.98', '$561,872.42', '$8,965.34', '-14.62%'),
+        'house': ('$3,892,077.01', '$544,070.82', '$5,972.33', '-59.25%'),
+    }
+    for engine in ('decimal', 'vectorized', 'yearly'):
+        for home_investment in (
+                test_home_investment_condo(breakdown_engine=engine),
+                build_home_investment(params_from_yaml(rel('scenarios/house.yaml')), breakdown_engine=engine),
+        ):
+            equity, interest_paid, tax_savings, score = golden[home_investment.scenario_name]
+            breakdown = home_investment.breakdown
+            final_month, final_year = breakdown.monthly.at(360).dict(), breakdown.yearly.at(30).dict()
+            for final in (final_month, final_year):
+                assert (final['equity'], final['interest_paid'], final['score']) == (equity, interest_paid, score)
+            assert breakdown.yearly.at(1).dict()['tax_savings'] == tax_savings
+            assert breakdown.monthly.size() == 361 and breakdown.yearly.size() == 31
+
+
+def test_profile_counts_stages():
+    with profile() as outer:
+        home_investment = test_home_investment_condo()
+        home_investment.breakdown.monthly.list()
+        home_investment.breakdown.monthly.list()
+        home_investment.breakdown.yearly.list()
+        with profile() as inner:
+            stage('test.stage')(lambda: None)()
+            stage('test.stage')(lambda: None)()
+    with timed('test.outside'):
+        pass
+
+    # Stages of nested profiles are recorded by both, a second list() is served from memory
+    factories = ['purchase', 'mortgage', 'taxes', 'income', 'operating_expenses', 'sale']
+    assert inner.calls == {'test.stage': 2}
+    assert outer.calls == {f'factory.{name}': 1 for name in factories} | {
+        'taxes.tax_deduction_per_year': 1,
+        'income.tax_savings': 1,
+        'breakdown.month.rows': 1,
+        'breakdown.year.rows': 1,
+        'test.stage': 2,
+    }
+    assert [row['stage'] for row in outer.report()] == sorted(outer.seconds, key=lambda name: -outer.seconds[name])
+    lines = str(outer).splitlines()
+    assert lines[0].split() == ['stage', 'calls', 'total', 'ms', 'ms/call'] and len(lines) == 1 + len(outer.calls)
+
+    # HOUSING_PROFILE profiles a whole process
+    with tempfile.TemporaryDirectory() as path:
+        code = (
+            'from src.scenario import build_home_investment, params_from_yaml; '
+            'build_home_investment(params_from_yaml("scenarios/condo.yaml")).breakdown.yearly.list()'
+        )
+        env = dict(os.environ, **{PROFILE_ENV: f'{path}/profile.json'})
+        subprocess.run([sys.executable, '-c', code], cwd=rel('.'), env=env, check=True)
+        with open(f'{path}/profile.json') as f:
+            report = {row['stage']: row['calls'] for row in json.load(f)}
+    assert report['breakdown.year.rows'] == report['breakdown.month.rows'] == report['factory.taxes'] == 1
+
+
+def test_dollar_fixed_point_formatting():
+    assert f'{Dollar(1234.5)}' == '$1,234.50'
+    assert f'{Dollar(-63.1) - Dollar(0.004)}' == '$-63.10'
+    assert f'{Percent(11.3)}' == '11.30%'
+    assert Dollar('2.675').cents == 268 and Dollar('2.665').cents == 266
+    assert Dollar(100) / 3 * 3 == Dollar('99.9999999999999999')
+    assert Dollar(5) > 4 and Dollar(5) == 5 and hash(Dollar(5)) == hash(5)
+    # Floats compare exactly, so values that compare equal hash equal
+    assert Dollar('0.1') != 0.1 and Dollar('0.5') == 0.5 and hash(Dollar('0.5')) == hash(0.5)
+    assert Dollar('0.1') < 0.1 < Dollar('0.1000000000000001')
+    assert Dollar(-7) // 2 == Dollar(-4) and isinstance(Dollar(-7) // 2, Dollar) and Dollar(-7) % 2 == 1
+    assert round(Dollar('2.5')) == 2 and type(round(Dollar('2.5'))) is int
+    assert round(Dollar('2.567'), 2) == Dollar('2.57')
+
+
+def test_monte_carlo_without_variance_matches_deterministic():
+    fixed = {rate: Distribution(0) for rate in RATES}
+    for home_investment in (test_home_investment_condo(), test_home_investment_low_interest_house_fully_rented()):
+        result = simulate(home_investment, paths=10, distributions=fixed, seed=0)
+        yearly = {k: v[::12] for k, v in monthly_arrays(home_investment).items()}
+        for column, band in result.bands.items():
+            tolerance = TOLERANCE_PERCENT if column == 'score' else TOLERANCE_DOLLARS
+            assert abs(band - yearly[column]).max() <= tolerance, column
+
+
+def test_monte_carlo_draws_tenant_rent_growth():
+    # The house is rented to tenants only, so its value varies with the tenant rent and not the rent growth
+    home_investment = test_home_investment_low_interest_house_fully_rented()
+    fixed = {rate: Distribution(0) for rate in RATES}
+    spreads = {}
+    for rate in ('rent_increase', 'tenant_rent_increase'):
+        result = simulate(home_investment, paths=200, distributions=fixed | {rate: Distribution(5)}, seed=0)
+        bands = result.bands['home_investment_value'][:, -1]
+        spreads[rate] = bands[-1] - bands[0]
+    assert spreads['rent_increase'] == 0 and spreads['tenant_rent_increase'] > 100000, spreads
+
+
+def test_goal_seek_maximum_price():
+    params = params_from_yaml(rel('scenarios/house.yaml'))
+    result = goal_seek(params, 'purchase.price', at_year('score', 10), low=100000, high=3000000)
+    assert result.converged and result.evaluations < 40
+    assert result.metric >= 0 and abs(result.value - result.other_value) <= .01
+
+
+def test_scenario_with_changes_reuses_unchanged_components():
+    base = Scenario(params_from_yaml(rel('scenarios/house.yaml')))
+    base.home_investment.breakdown.monthly.list()
+    changes = {'sale.annual_appreciation_percent': 6}
+    changed = base.with_changes(changes)
+    assert changed.home_investment.taxes is base.home_investment.taxes
+    assert changed.home_investment.sale is not base.home_investment.sale
+    fresh = build_home_investment(with_params(base.params, changes))
+    assert changed.home_investment.breakdown.yearly.dicts() == fresh.breakdown.yearly.dicts()
+
+
+def test_batch_matches_home_investment():
+    # Rows of the batch table use the flat keys of the yaml scenarios
+    paths = [rel('scenarios', f'{name}.yaml') for name in ('condo', 'house', 'house2')]
+    rows = [yaml_safe_load(path) for path in paths]
+    table = {key: [row.get(key) for row in rows] for key in sorted(set().union(*rows))}
+    results = evaluate(table, chunk_scenarios=2)
+    assert list(results) == list(table) + RESULT_COLUMNS
+    for index, path in enumerate(paths):
+        arrays = build_home_investment(params_from_yaml(path), breakdown_engine='vectorized').breakdown.monthly.arrays()
+        for column in ('home_investment_value', 'index_fund_value'):
+            assert abs(results[column][index] - arrays[column][-1]) <= TOLERANCE_DOLLARS, column
+        assert abs(results['score'][index] - arrays['score'][-1]) <= TOLERANCE_PERCENT
+
+
+def test_result_cache_returns_identical_breakdowns():
+    params = params_from_yaml(rel('scenarios/house.yaml'))
+    with tempfile.TemporaryDirectory() as path:
+        cache = ResultCache(path)
+        first = build_home_investment(params, cache=cache)
+        first.breakdown.yearly.list()
+        cached = build_home_investment(params, cache=cache)
+        assert cached.breakdown.monthly.dicts() == first.breakdown.monthly.dicts()
+        assert cached.breakdown.yearly.dicts() == first.breakdown.yearly.dicts()
+        assert (cache.hits, cache.misses) == (2, 2)
+
+        # Without fcntl, e.g. on Windows, eviction goes ahead without the lock
+        cache.max_bytes = 0
+        with unittest.mock.patch.dict(sys.modules, fcntl=None):
+            cache.evict()
+        assert cache.size() == 0
+
+
+def test_scenario_spec_round_trips():
+    path = rel('scenarios/house2.yaml')
+    spec = ScenarioSpec.from_yaml(path)
+    assert yaml.safe_load(spec.to_yaml()) == yaml_safe_load(path)
+    assert ScenarioSpec.from_params(with_params(spec.params(), {'purchase.price': 1200000})) == spec._replace(
+        purchase=spec.purchase._replace(price=1200000.0)
     )
+    unpickled = pickle.loads(pickle.dumps(spec))
+    assert unpickled == spec and hash(unpickled) == hash(spec) and unpickled.digest() == spec.digest()
+    assert spec.digest() == scenario_hash(params_from_yaml(path))
+    renamed = spec._replace(scenario_name='renamed')
+    assert renamed == spec and hash(renamed) == hash(spec) and renamed.digest() == spec.digest()
+    assert spec._replace(index_fund_annual_return_percent=1.) != spec
+    expected = build_home_investment(params_from_yaml(path)).breakdown.yearly.dicts()
+    assert unpickled.home_investment().breakdown.yearly.dicts() == expected
+
+
+def test_timeline_serialization_round_trips():
+    timeline = build_home_investment(params_from_yaml(rel('scenarios/house.yaml'))).breakdown.monthly.list()
+    assert pickle.loads(pickle.dumps(timeline)).dicts() == timeline.dicts()
+    assert Timeline.from_bytes(timeline.to_bytes(compress=True)).dicts() == timeline.dicts()
+    cents = timeline.astype('cents')
+    assert cents.nbytes < timeline.nbytes
+    assert all(abs(a - b) <= Dollar('0.005') for a, b in zip(cents.column('equity'), timeline.column('equity')))
+    with tempfile.TemporaryDirectory() as path:
+        doubles = timeline.astype('float64')
+        doubles.save(f'{path}/month.bin')
+        loaded = Timeline.load(f'{path}/month.bin')
+        score = loaded.array('score')
+        assert not score.flags.owndata and score[-1] == float(timeline.column('score')[-1])
+        assert loaded.dicts() == doubles.dicts()
+        del loaded, score
+
+
+def test_result_store_queries_match_breakdowns():
+    spec = ScenarioSpec.from_yaml(rel('scenarios/house.yaml'))
+    specs = [spec._replace(purchase=spec.purchase._replace(price=price)) for price in (700000., 800000., 900000.)]
+    with tempfile.TemporaryDirectory() as path:
+        store = ResultStore.create(f'{path}/store', capacity=3)
+        for s in specs:
+            store.append(s, *scenario_arrays(s.home_investment(breakdown_engine='vectorized')))
+        store.flush()
+        reader = ResultStore(f'{path}/store')
+        (index,) = reader.where({'purchase.price': 800000})
+        expected = specs[index].home_investment().breakdown.yearly.at(10)
+        assert abs(reader.year('score')[index, 10] - float(expected.score)) <= TOLERANCE_PERCENT
+        assert abs(reader.year('yearly_cashflow')[index, 10] - float(expected.yearly_cashflow)) <= TOLERANCE_DOLLARS
+        assert reader.month('month').shape == (3, store.months)
+
+
+def test_main_skips_unchanged_and_keeps_same_named_inputs():
+    with tempfile.TemporaryDirectory() as path:
+        first, second = f'{path}/a/house.yaml', f'{path}/b/house.yaml'
+        for input_path, price in ((first, 800000), (second, 900000)):
+            os.makedirs(os.path.dirname(input_path))
+            with open(input_path, 'w') as f:
+                yaml.safe_dump(yaml_safe_load(rel('scenarios/house.yaml')) | dict(purchase_price=price), f)
+        output_dir, cache_dir = f'{path}/output', f'{path}/cache'
+        written = main([first, second], False, processes=1, output_dir=output_dir, cache_dir=cache_dir)
+        assert len(written) == 2 and sorted(os.listdir(output_dir)) == sorted(map(os.path.basename, written))
+        assert main([first, second], False, processes=1, output_dir=output_dir, cache_dir=cache_dir) == []
+
+        with open(first, 'w') as f:
+            yaml.safe_dump(yaml_safe_load(rel('scenarios/house.yaml')) | dict(purchase_price=850000), f)
+        (edited,) = main([first, second], False, processes=1, output_dir=output_dir, cache_dir=cache_dir)
+        assert sorted(os.listdir(output_dir)) == sorted([os.path.basename(edited), os.path.basename(written[1])])
+
+        (vectorized,) = main(
+            [first], False, processes=1, engine='vectorized', output_dir=output_dir, cache_dir=cache_dir
+        )
+        assert not os.path.isdir(edited) and os.path.isdir(vectorized) and os.path.isdir(written[1])
+
+
+def test_sweep_rows_match_summaries():
+    base = params_from_yaml(rel('scenarios/house.yaml'))
+    grid = {'purchase.price': [700000, 900000], 'sale.annual_appreciation_percent': [3, 6]}
+    with tempfile.TemporaryDirectory() as path:
+        for engine in ('decimal', 'vectorized', 'yearly'):
+            sweep(base, grid, f'{path}/{engine}.csv', processes=2, engine=engine)
+            with open(f'{path}/{engine}.csv') as f:
+                rows = list(csv.DictReader(f))
+            assert len(rows) == grid_size(grid)
+            for row, (point, params) in zip(rows, expand_grid(base, grid)):
+                summary = summarize(build_home_investment(params, breakdown_engine=engine))
+                assert type(summary['break_even_year']) in (int, type(None))
+                expected = {k: str(v) for k, v in point.items()} | {
+                    k: '' if v is None else str(v) for k, v in summary.items()
+                }
+                assert row == expected, engine
+
+
+def test_memory_budget_evicts_and_frees_breakdowns():
+    class Owner(object):
+        pass
+
+    budget = MemoryBudget(max_bytes=200)
+    first, second = Owner(), Owner()
+    budget.get(first, 'rows', lambda: b'1' * 100, len)
+    budget.get(second, 'rows', lambda: b'2' * 100, len)
+    budget.get(first, 'rows', lambda: b'', len)
+    budget.get(second, 'other', lambda: b'3' * 100, len)
+    assert budget.peek(second, 'rows') is None and budget.peek(first, 'rows') == b'1' * 100
+    assert (budget.hits, budget.misses, budget.evictions, budget.bytes) == (1, 3, 1, 200)
+
+    home_investment = test_home_investment_condo()
+    home_investment.breakdown.monthly.list()
+    reference = weakref.ref(home_investment)
+    del home_investment
+    gc.collect()
+    assert reference() is None
+
+
+def test_view_exports_match_dataframes():
+    with tempfile.TemporaryDirectory() as path:
+        breakdown = test_home_investment_condo(output_dir=path).breakdown
+        for breakdown_for in (breakdown.monthly, breakdown.yearly):
+            for view in VIEWS:
+                (output_path,) = breakdown_for.export([view])
+                with open(output_path) as f:
+                    assert f.read() == breakdown_for.df(breakdown_for.view_columns(view)).to_csv(index=False), view
+
+
+def test_parquet_export_round_trip():
+    parquet = pytest.importorskip('pyarrow.parquet')
+    with tempfile.TemporaryDirectory() as path:
+        breakdown = test_home_investment_condo(output_dir=path).breakdown
+        for breakdown_for in (breakdown.monthly, breakdown.yearly):
+            rows = breakdown_for.list()
+            for output_path, view in zip(breakdown_for.export(fmt='parquet'), VIEWS):
+                table = parquet.read_table(output_path).to_pydict()
+                assert list(table) == breakdown_for.view_columns(view)
+                for key, values in table.items():
+                    name, kind = breakdown_for.keys[key]
+                    expected = [v if v is None or kind == 'int' else float(v) for v in rows.column(name)]
+                    assert values == expected, (view, key)
+
+
+# Seconds a fresh interpreter may spend importing the model, which short lived sweep and cli workers pay every time
+IMPORT_BUDGET_SECONDS = .25
 
 
-def test_home_investment_low_interest_house_fully_rented():
-    return HomeInvestment(
-        scenario_name='home_investment_low_interest_house_fully_rented',
-        purchase=purchase(
-            price=850 * 1000,
-            down_payment=None,
-            down_payment_percent=20,
-            closing_cost_percent=2
-        ),
-        mortgage=mortgage(
-            interest_rate_percent=3.25,
-            loan_term_years=30
-        ),
-        taxes=taxes(
-            property_tax_percent=1.25,
-            property_tax_annual_increase_percent=2,
-            federal_tax_rate_percent=35,
-            state_tax_rate_percent=11.3,
-            yearly_income=500 * 1000,
-        ),
-        operating_expenses=operating_expenses(
-            hoi_percent=0.22,
-            hoi_annual_increase_percent=2,
-            hoa=None,
-            hoa_annual_increase_percent=None,
-            maintenance_percent=1,
-            maintenance_annual_increase_percent=2,
-            other_percent=None,
-            other_annual_increase_percent=None
-        ),
-        income=income(
-            rent=None,
-            rent_annual_increase_percent=None,
-            tenant_rent=4500,
-            tenant_rent_annual_increase_percent=3,
-            vacancy_percent=5,
-            management_fee_percent=8,
-        ),
-        sale=sale(
-            closing_cost_percent=8,
-            annual_appreciation_percent=5,
-        ),
-        index_fund_annual_return_percent=9,
+def test_import_budget():
+    code = (
+        'import sys, time; start = time.perf_counter(); import src.homeinvestment; '
+        'print(time.perf_counter() - start, *(m for m in ("pandas", "numpy", "tabulate", "yaml") if m in sys.modules))'
     )
+    seconds, *heavy_modules = subprocess.check_output([sys.executable, '-c', code], cwd=rel('.'), text=True).split()
+    assert not heavy_modules, heavy_modules
+    assert float(seconds) < IMPORT_BUDGET_SECONDS, seconds
 
 
 if __name__ == '__main__':
@@ -151,11 +429,5 @@ if __name__ == '__main__':
     print('testing...')
     hi = test_home_investment_low_interest_house_fully_rented()
     hi.describe()
-    hi.breakdown.yearly.csv_income()
-    hi.breakdown.yearly.csv_operating_cost()
-    hi.breakdown.yearly.csv_cashflow()
-    hi.breakdown.yearly.csv_investment()
-    hi.breakdown.monthly.csv_income()
-    hi.breakdown.monthly.csv_operating_cost()
-    hi.breakdown.monthly.csv_cashflow()
-    hi.breakdown.monthly.csv_investment()
+    hi.breakdown.yearly.export(['income', 'operating_cost', 'cashflow', 'investment'])
+    hi.breakdown.monthly.export(['income', 'operating_cost', 'cashflow', 'investment'])